@@ -1,15 +1,53 @@
 import os
 from pathlib import Path
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 # Support environment variable for Docker deployments
 _default_path = Path(__file__).parent.parent / "scales.db"
 DATABASE_PATH = Path(os.environ.get("DATABASE_PATH", str(_default_path)))
 DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# Upper bound on concurrent sessions. main.py sizes the request worker thread
+# pool to match, so a busy server never queues threads waiting on the pool.
+MAX_DB_CONNECTIONS = 40
+
+# Keep a small pool of open connections so requests reuse them (and their PRAGMAs)
+# instead of reopening the database file each time.
+engine = create_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=QueuePool,
+    pool_size=10,
+    max_overflow=MAX_DB_CONNECTIONS - 10,
+)
+
+# Per-connection SQLite tuning: WAL lets readers proceed while a writer commits,
+# and synchronous=NORMAL is safe in WAL mode while saving an fsync per commit.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA mmap_size=268435456",
+)
+
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, _connection_record):
+    if str(DATABASE_PATH) == ":memory:":
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -27,3 +65,9 @@ def get_db():
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+
+
+def optimize_db():
+    """Let SQLite refresh query planner statistics (cheap, recommended on close)."""
+    with engine.connect() as conn:
+        conn.execute(text("PRAGMA optimize"))
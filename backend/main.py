@@ -1,16 +1,24 @@
 from contextlib import asynccontextmanager
 
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from database import SessionLocal, init_db
+from database import MAX_DB_CONNECTIONS, SessionLocal, init_db, optimize_db
 from routes import arpeggios, practice, scales, selection_sets, settings
 from services.initializer import init_scales_and_arpeggios
 from static_server import setup_static_serving
 
+# Route handlers are plain `def` (SQLAlchemy sessions are blocking), so Starlette
+# runs them in this worker thread pool instead of on the event loop. Each worker
+# holds at most one session, so the pool is sized to the connection limit.
+THREADPOOL_SIZE = MAX_DB_CONNECTIONS
+
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
     # Startup: initialize database tables
     init_db()
 
@@ -22,7 +30,9 @@ async def lifespan(_app: FastAPI):
         db.close()
 
     yield
-    # Shutdown: nothing to do
+
+    # Shutdown: refresh query planner statistics
+    optimize_db()
 
 
 app = FastAPI(
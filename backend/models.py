@@ -1,11 +1,46 @@
 from datetime import datetime
+from functools import lru_cache
 from typing import Any
 
-from sqlalchemy import JSON, Boolean, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    func,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database import Base
 
+ACCIDENTAL_SYMBOLS: dict[str | None, str] = {"flat": "♭", "sharp": "♯", None: ""}
+
+
+@lru_cache(maxsize=32)
+def _humanize_type(item_type: str) -> str:
+    return item_type.replace("_", " ")
+
+
+# Display names come from a small fixed set of note/type/octave combinations
+@lru_cache(maxsize=1024)
+def scale_display_name(note: str, accidental: str | None, scale_type: str, octaves: int) -> str:
+    acc_symbol = ACCIDENTAL_SYMBOLS.get(accidental, "")
+    type_display = _humanize_type(scale_type)
+    return f"{note}{acc_symbol} {type_display} - {octaves} octave{'s' if octaves > 1 else ''}"
+
+
+@lru_cache(maxsize=1024)
+def arpeggio_display_name(
+    note: str, accidental: str | None, arpeggio_type: str, octaves: int
+) -> str:
+    acc_symbol = ACCIDENTAL_SYMBOLS.get(accidental, "")
+    return f"{note}{acc_symbol} {arpeggio_type} arpeggio - {octaves} octaves"
+
 
 class Scale(Base):
     __tablename__ = "scales"
@@ -23,12 +58,14 @@ class Scale(Base):
     articulation_mode: Mapped[str] = mapped_column(
         String, default="both"
     )  # "both", "separate_only", "slurred_only"
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    # Stamped in Python so every row stores the same microsecond text format as
+    # bound datetime parameters; the server default only covers raw SQL inserts
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, server_default=func.now()
+    )
 
     def display_name(self) -> str:
-        acc_symbol = {"flat": "♭", "sharp": "♯"}.get(self.accidental or "", "")
-        type_display = self.type.replace("_", " ")
-        return f"{self.note}{acc_symbol} {type_display} - {self.octaves} octave{'s' if self.octaves > 1 else ''}"
+        return scale_display_name(self.note, self.accidental, self.type, self.octaves)
 
 
 class Arpeggio(Base):
@@ -45,11 +82,12 @@ class Arpeggio(Base):
     articulation_mode: Mapped[str] = mapped_column(
         String, default="both"
     )  # "both", "separate_only", "slurred_only"
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, server_default=func.now()
+    )
 
     def display_name(self) -> str:
-        acc_symbol = {"flat": "♭", "sharp": "♯"}.get(self.accidental or "", "")
-        return f"{self.note}{acc_symbol} {self.type} arpeggio - {self.octaves} octaves"
+        return arpeggio_display_name(self.note, self.accidental, self.type, self.octaves)
 
 
 class SelectionSet(Base):
@@ -60,11 +98,23 @@ class SelectionSet(Base):
     is_active: Mapped[bool] = mapped_column(Boolean, default=False)
     scale_ids: Mapped[list[int]] = mapped_column(JSON, nullable=False, default=list)
     arpeggio_ids: Mapped[list[int]] = mapped_column(JSON, nullable=False, default=list)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, server_default=func.now()
+    )
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
 
+    # Partial unique index: only the active set is indexed, and at most one may be active
+    __table_args__ = (
+        Index(
+            "ix_selection_sets_one_active",
+            "is_active",
+            unique=True,
+            sqlite_where=text("is_active"),
+        ),
+    )
+
 
 class PracticeSession(Base):
     __tablename__ = "practice_sessions"
@@ -73,13 +123,24 @@ class PracticeSession(Base):
     selection_set_id: Mapped[int | None] = mapped_column(
         Integer, ForeignKey("selection_sets.id"), nullable=True
     )
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, server_default=func.now()
+    )
 
-    entries: Mapped[list["PracticeEntry"]] = relationship("PracticeEntry", back_populates="session")
+    # lazy="raise": load entries explicitly (e.g. selectinload) instead of per-session lazy loads
+    entries: Mapped[list["PracticeEntry"]] = relationship(
+        "PracticeEntry", back_populates="session", lazy="raise"
+    )
 
 
 class PracticeEntry(Base):
     __tablename__ = "practice_entries"
+    __table_args__ = (
+        Index(
+            "ix_practice_entries_item_stats", "item_type", "item_id", "was_practiced", "created_at"
+        ),
+        Index("ix_practice_entries_session", "session_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     session_id: Mapped[int] = mapped_column(
@@ -100,9 +161,13 @@ class PracticeEntry(Base):
     matched_target_bpm: Mapped[bool | None] = mapped_column(
         Boolean, nullable=True
     )  # Whether practiced matched target
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, server_default=func.now()
+    )
 
-    session: Mapped["PracticeSession"] = relationship("PracticeSession", back_populates="entries")
+    session: Mapped["PracticeSession"] = relationship(
+        "PracticeSession", back_populates="entries", lazy="raise"
+    )
 
 
 class Setting(Base):
@@ -124,6 +189,14 @@ class SchemaVersion(Base):
     description: Mapped[str] = mapped_column(String, nullable=False)
 
 
+# All scale and arpeggio combinations in the catalog (shared by initializer and migrations)
+NOTES = ["A", "B", "C", "D", "E", "F", "G"]
+ACCIDENTALS = [None, "flat", "sharp"]
+SCALE_TYPES = ["major", "minor_harmonic", "minor_melodic", "chromatic"]
+SCALE_OCTAVES = [1, 2, 3]
+ARPEGGIO_TYPES = ["major", "minor", "diminished", "dominant"]
+ARPEGGIO_OCTAVES = [1, 2, 3]
+
 # Default algorithm configuration
 # Each slot has a target percent (must sum to 100)
 # variation controls the randomness range (±variation/2 around target)
@@ -1,11 +1,12 @@
-from typing import Literal
+from typing import Literal, cast
 
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, computed_field
+from sqlalchemy import CursorResult, bindparam, lambda_stmt, select, update
 from sqlalchemy.orm import Session
 
 from database import get_db
-from models import Arpeggio
+from models import Arpeggio, arpeggio_display_name
 
 router = APIRouter()
 
@@ -20,9 +21,13 @@ class ArpeggioResponse(BaseModel):
     weight: float
     target_bpm: int | None
     articulation_mode: str
-    display_name: str
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def display_name(self) -> str:
+        return arpeggio_display_name(self.note, self.accidental, self.type, self.octaves)
 
 
 class ArpeggioUpdate(BaseModel):
@@ -37,8 +42,17 @@ class BulkEnableRequest(BaseModel):
     enabled: bool
 
 
+# Built once: the expanding IN parameter keeps one cached statement for any number of ids
+_BULK_ENABLE_STMT = (
+    update(Arpeggio)
+    .where(Arpeggio.id.in_(bindparam("ids", expanding=True)))
+    .values(enabled=bindparam("enable"))
+    .execution_options(synchronize_session=False)
+)
+
+
 @router.get("/arpeggios", response_model=list[ArpeggioResponse])
-async def get_arpeggios(
+def get_arpeggios(
     note: str | None = None,
     type: str | None = None,
     octaves: int | None = None,
@@ -46,23 +60,39 @@ async def get_arpeggios(
     db: Session = Depends(get_db),
 ):
     """Get all arpeggios with optional filtering."""
-    query = db.query(Arpeggio)
+    # Select plain columns: this is a read-only listing, so skip ORM instances.
+    # lambda_stmt caches the constructed statement per combination of filters.
+    stmt = lambda_stmt(
+        lambda: select(
+            Arpeggio.id,
+            Arpeggio.note,
+            Arpeggio.accidental,
+            Arpeggio.type,
+            Arpeggio.octaves,
+            Arpeggio.enabled,
+            Arpeggio.weight,
+            Arpeggio.target_bpm,
+            Arpeggio.articulation_mode,
+        )
+    )
 
     if note:
-        query = query.filter(Arpeggio.note == note)
+        stmt += lambda s: s.where(Arpeggio.note == note)
     if type:
-        query = query.filter(Arpeggio.type == type)
+        stmt += lambda s: s.where(Arpeggio.type == type)
     if octaves:
-        query = query.filter(Arpeggio.octaves == octaves)
+        stmt += lambda s: s.where(Arpeggio.octaves == octaves)
     if enabled is not None:
-        query = query.filter(Arpeggio.enabled == enabled)
+        stmt += lambda s: s.where(Arpeggio.enabled == enabled)
 
-    arpeggios = query.order_by(
+    stmt += lambda s: s.order_by(
         Arpeggio.note, Arpeggio.accidental, Arpeggio.type, Arpeggio.octaves
-    ).all()
+    )
+    rows = db.execute(stmt).all()
 
+    # Rows come from typed columns, so build responses without re-validating them
     return [
-        ArpeggioResponse(
+        ArpeggioResponse.model_construct(
             id=a.id,
             note=a.note,
             accidental=a.accidental,
@@ -72,14 +102,13 @@ async def get_arpeggios(
             weight=a.weight,
             target_bpm=a.target_bpm,
             articulation_mode=a.articulation_mode,
-            display_name=a.display_name(),
         )
-        for a in arpeggios
+        for a in rows
     ]
 
 
 @router.put("/arpeggios/{arpeggio_id}", response_model=ArpeggioResponse)
-async def update_arpeggio(arpeggio_id: int, update: ArpeggioUpdate, db: Session = Depends(get_db)):
+def update_arpeggio(arpeggio_id: int, update: ArpeggioUpdate, db: Session = Depends(get_db)):
     """Update an arpeggio's enabled status or weight."""
     arpeggio = db.query(Arpeggio).filter(Arpeggio.id == arpeggio_id).first()
     if not arpeggio:
@@ -98,27 +127,15 @@ async def update_arpeggio(arpeggio_id: int, update: ArpeggioUpdate, db: Session
     db.commit()
     db.refresh(arpeggio)
 
-    return ArpeggioResponse(
-        id=arpeggio.id,
-        note=arpeggio.note,
-        accidental=arpeggio.accidental,
-        type=arpeggio.type,
-        octaves=arpeggio.octaves,
-        enabled=arpeggio.enabled,
-        weight=arpeggio.weight,
-        target_bpm=arpeggio.target_bpm,
-        articulation_mode=arpeggio.articulation_mode,
-        display_name=arpeggio.display_name(),
-    )
+    return ArpeggioResponse.model_validate(arpeggio)
 
 
 @router.post("/arpeggios/bulk-enable")
-async def bulk_enable_arpeggios(request: BulkEnableRequest, db: Session = Depends(get_db)):
+def bulk_enable_arpeggios(request: BulkEnableRequest, db: Session = Depends(get_db)):
     """Enable or disable multiple arpeggios at once."""
-    updated = (
-        db.query(Arpeggio)
-        .filter(Arpeggio.id.in_(request.ids))
-        .update({"enabled": request.enabled}, synchronize_session=False)
+    result = cast(
+        CursorResult,
+        db.execute(_BULK_ENABLE_STMT, {"ids": request.ids, "enable": request.enabled}),
     )
     db.commit()
-    return {"updated": updated}
+    return {"updated": result.rowcount}
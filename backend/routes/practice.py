@@ -2,10 +2,20 @@ from datetime import datetime, timedelta
 
 from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel
+from sqlalchemy import Select, Subquery, case, func, insert, literal, select, union_all
 from sqlalchemy.orm import Session
 
 from database import get_db
-from models import Arpeggio, PracticeEntry, PracticeSession, Scale, SelectionSet, Setting
+from models import (
+    Arpeggio,
+    PracticeEntry,
+    PracticeSession,
+    Scale,
+    SelectionSet,
+    arpeggio_display_name,
+    scale_display_name,
+)
+from services.algorithm_config import get_algorithm_settings
 from services.selector import calculate_all_likelihoods, generate_practice_set
 
 router = APIRouter()
@@ -77,148 +87,159 @@ class PracticeHistoryDetailedItem(BaseModel):
 
 
 @router.post("/generate-set", response_model=GenerateSetResponse)
-async def generate_set(db: Session = Depends(get_db)):
+def generate_set(db: Session = Depends(get_db)):
     """Generate a randomized practice set based on current configuration."""
     items = generate_practice_set(db)
     return GenerateSetResponse(items=[PracticeItem(**item) for item in items])
 
 
 @router.post("/practice-session", response_model=SessionResponse)
-async def create_practice_session(request: CreateSessionRequest, db: Session = Depends(get_db)):
+def create_practice_session(request: CreateSessionRequest, db: Session = Depends(get_db)):
     """Record a practice session with the items that were practiced."""
-    # Look up the currently active selection set
-    active_set = db.query(SelectionSet).filter(SelectionSet.is_active).first()
+    # Look up the currently active selection set (only its id is needed)
+    active_set_id = db.scalar(select(SelectionSet.id).where(SelectionSet.is_active).limit(1))
     session = PracticeSession(
-        selection_set_id=active_set.id if active_set else None,
+        selection_set_id=active_set_id,
     )
     db.add(session)
     db.flush()  # Get the session ID
 
-    practiced_count = 0
-    for entry_input in request.entries:
-        # was_practiced is true if either slurred or separate was practiced
-        was_practiced = (
-            entry_input.was_practiced
-            or entry_input.practiced_slurred
-            or entry_input.practiced_separate
-        )
-        entry = PracticeEntry(
-            session_id=session.id,
-            item_type=entry_input.item_type,
-            item_id=entry_input.item_id,
-            articulation=entry_input.articulation,
-            was_practiced=was_practiced,
-            practiced_slurred=entry_input.practiced_slurred,
-            practiced_separate=entry_input.practiced_separate,
-            practiced_bpm=entry_input.practiced_bpm,
-            target_bpm=entry_input.target_bpm,
-            matched_target_bpm=entry_input.matched_target_bpm,
-        )
-        db.add(entry)
-        if was_practiced:
-            practiced_count += 1
-
-    db.commit()
-    db.refresh(session)
-
-    return SessionResponse(
+    rows = [
+        {
+            "session_id": session.id,
+            "item_type": entry_input.item_type,
+            "item_id": entry_input.item_id,
+            "articulation": entry_input.articulation,
+            # was_practiced is true if either slurred or separate was practiced
+            "was_practiced": (
+                entry_input.was_practiced
+                or entry_input.practiced_slurred
+                or entry_input.practiced_separate
+            ),
+            "practiced_slurred": entry_input.practiced_slurred,
+            "practiced_separate": entry_input.practiced_separate,
+            "practiced_bpm": entry_input.practiced_bpm,
+            "target_bpm": entry_input.target_bpm,
+            "matched_target_bpm": entry_input.matched_target_bpm,
+        }
+        for entry_input in request.entries
+    ]
+    practiced_count = sum(1 for row in rows if row["was_practiced"])
+
+    # Insert all entries in a single executemany instead of one flush per object;
+    # render_nulls keeps rows with and without a BPM in the same batch
+    if rows:
+        db.execute(insert(PracticeEntry).execution_options(render_nulls=True), rows)
+
+    # Build the response before commit expires the session; the flush already set
+    # id and the Python-side created_at default, so no refresh SELECT is needed
+    response = SessionResponse(
         id=session.id,
         created_at=session.created_at,
         entries_count=len(request.entries),
         practiced_count=practiced_count,
         selection_set_id=session.selection_set_id,
     )
+    db.commit()
 
+    return response
 
-@router.get("/practice-history", response_model=list[PracticeHistoryItem])
-async def get_practice_history(item_type: str | None = None, db: Session = Depends(get_db)):
-    """Get practice statistics for all items."""
-    history = []
 
-    # Get stats for scales
-    if item_type is None or item_type == "scale":
-        scales = db.query(Scale).filter(Scale.enabled).all()
-        for scale in scales:
-            entries = (
-                db.query(PracticeEntry)
-                .filter(PracticeEntry.item_type == "scale", PracticeEntry.item_id == scale.id)
-                .all()
-            )
+def _history_stats(item_type: str) -> Subquery:
+    """Aggregate practice entries of one item type per item_id.
 
-            total_sessions = len(entries)
-            times_practiced = len([e for e in entries if e.was_practiced])
-            last_practiced = None
-            max_practiced_bpm = None
-            if entries:
-                practiced_entries = [e for e in entries if e.was_practiced]
-                if practiced_entries:
-                    last_practiced = max(e.created_at for e in practiced_entries)
-                    # Get max practiced BPM from entries with BPM recorded
-                    bpm_entries = [
-                        e.practiced_bpm for e in practiced_entries if e.practiced_bpm is not None
-                    ]
-                    if bpm_entries:
-                        max_practiced_bpm = max(bpm_entries)
-
-            history.append(
-                PracticeHistoryItem(
-                    item_type="scale",
-                    item_id=scale.id,
-                    display_name=scale.display_name(),
-                    total_sessions=total_sessions,
-                    times_practiced=times_practiced,
-                    last_practiced=last_practiced,
-                    max_practiced_bpm=max_practiced_bpm,
-                    target_bpm=scale.target_bpm,
-                )
-            )
+    Yields total entries, practiced count, last practiced date and max
+    practiced BPM for each item in a single grouped query.
+    """
+    return (
+        select(
+            PracticeEntry.item_id,
+            func.count().label("total"),
+            func.sum(case((PracticeEntry.was_practiced, 1), else_=0)).label("practiced"),
+            func.max(case((PracticeEntry.was_practiced, PracticeEntry.created_at))).label("last"),
+            func.max(case((PracticeEntry.was_practiced, PracticeEntry.practiced_bpm))).label(
+                "max_bpm"
+            ),
+        )
+        .where(PracticeEntry.item_type == item_type)
+        .group_by(PracticeEntry.item_id)
+        .subquery()
+    )
 
-    # Get stats for arpeggios
-    if item_type is None or item_type == "arpeggio":
-        arpeggios = db.query(Arpeggio).filter(Arpeggio.enabled).all()
-        for arpeggio in arpeggios:
-            entries = (
-                db.query(PracticeEntry)
-                .filter(PracticeEntry.item_type == "arpeggio", PracticeEntry.item_id == arpeggio.id)
-                .all()
-            )
 
-            total_sessions = len(entries)
-            times_practiced = len([e for e in entries if e.was_practiced])
-            last_practiced = None
-            max_practiced_bpm = None
-            if entries:
-                practiced_entries = [e for e in entries if e.was_practiced]
-                if practiced_entries:
-                    last_practiced = max(e.created_at for e in practiced_entries)
-                    # Get max practiced BPM from entries with BPM recorded
-                    bpm_entries = [
-                        e.practiced_bpm for e in practiced_entries if e.practiced_bpm is not None
-                    ]
-                    if bpm_entries:
-                        max_practiced_bpm = max(bpm_entries)
-
-            history.append(
-                PracticeHistoryItem(
-                    item_type="arpeggio",
-                    item_id=arpeggio.id,
-                    display_name=arpeggio.display_name(),
-                    total_sessions=total_sessions,
-                    times_practiced=times_practiced,
-                    last_practiced=last_practiced,
-                    max_practiced_bpm=max_practiced_bpm,
-                    target_bpm=arpeggio.target_bpm,
-                )
-            )
+def _history_select(model: type[Scale] | type[Arpeggio], item_type: str) -> Select:
+    """Select enabled items of one type joined with their aggregated practice stats."""
+    stats = _history_stats(item_type)
+    return (
+        select(
+            literal(item_type).label("item_type"),
+            model.id.label("item_id"),
+            model.note,
+            model.accidental,
+            model.type,
+            model.octaves,
+            model.target_bpm,
+            func.coalesce(stats.c.total, 0).label("total"),
+            func.coalesce(stats.c.practiced, 0).label("practiced"),
+            stats.c.last,
+            stats.c.max_bpm,
+        )
+        .outerjoin(stats, stats.c.item_id == model.id)
+        .where(model.enabled)
+    )
 
-    # Sort by times practiced (ascending) to show least practiced first
-    history.sort(key=lambda x: x.times_practiced)
 
-    return history
+@router.get("/practice-history", response_model=list[PracticeHistoryItem])
+def get_practice_history(
+    item_type: str | None = None,
+    limit: int | None = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    """Get practice statistics for all items, least practiced first."""
+    selects = []
+    if item_type is None or item_type == "scale":
+        selects.append(_history_select(Scale, "scale"))
+    if item_type is None or item_type == "arpeggio":
+        selects.append(_history_select(Arpeggio, "arpeggio"))
+    if not selects:
+        return []
+
+    # Sort and paginate in SQL to show least practiced first; ties list scales
+    # before arpeggios, then by id, so pages are stable
+    history = union_all(*selects).subquery()
+    stmt = (
+        select(history)
+        .order_by(
+            history.c.practiced,
+            case((history.c.item_type == "scale", 0), else_=1),
+            history.c.item_id,
+        )
+        .limit(limit)
+        .offset(offset)
+    )
+
+    return [
+        PracticeHistoryItem(
+            item_type=row.item_type,
+            item_id=row.item_id,
+            display_name=(
+                scale_display_name(row.note, row.accidental, row.type, row.octaves)
+                if row.item_type == "scale"
+                else arpeggio_display_name(row.note, row.accidental, row.type, row.octaves)
+            ),
+            total_sessions=row.total,
+            times_practiced=row.practiced,
+            last_practiced=row.last,
+            max_practiced_bpm=row.max_bpm,
+            target_bpm=row.target_bpm,
+        )
+        for row in db.execute(stmt)
+    ]
 
 
 @router.get("/practice-history-detailed", response_model=list[PracticeHistoryDetailedItem])
-async def get_practice_history_detailed(
+def get_practice_history_detailed(
     item_type: str | None = Query(None, description="Filter by item type: 'scale' or 'arpeggio'"),
     subtype: str | None = Query(None, description="Filter by subtype (e.g., 'major', 'minor')"),
     note: str | None = Query(None, description="Filter by note (e.g., 'A', 'B', 'C')"),
@@ -237,129 +258,108 @@ async def get_practice_history_detailed(
     """
     history: list[PracticeHistoryDetailedItem] = []
 
+    # Read the algorithm settings once for both the likelihoods and weekly focus
+    algorithm_settings = get_algorithm_settings(db)
+
     # Get selection likelihoods for all items (base probability without weekly focus)
-    likelihoods = calculate_all_likelihoods(db)
+    likelihoods = calculate_all_likelihoods(db, algorithm_settings.config)
 
     # Get weekly focus config to determine which items are focus items
-    setting = db.query(Setting).filter(Setting.key == "selection_algorithm").first()
-    weekly_focus = {}
-    if setting and setting.value:
-        weekly_focus = setting.value.get("weekly_focus", {})
-    wf_enabled = weekly_focus.get("enabled", False)
-    wf_keys = weekly_focus.get("keys", [])
-    wf_types = weekly_focus.get("types", [])
-    wf_categories = weekly_focus.get("categories", [])
+    weekly_focus = algorithm_settings.weekly_focus
+    wf_enabled = weekly_focus.enabled
+    wf_keys = weekly_focus.keys
+    wf_types = weekly_focus.types
+    wf_categories = weekly_focus.categories
+    has_key_or_type_criteria = bool(wf_keys or wf_types)
 
     def is_focus_item(item_note: str, item_subtype: str, item_category: str) -> bool:
         """Check if an item matches weekly focus criteria."""
         if not wf_enabled:
             return False
         matches_category = not wf_categories or item_category in wf_categories
-        has_key_or_type_criteria = wf_keys or wf_types
         matches_key_or_type = item_note in wf_keys or item_subtype in wf_types
         return matches_category and (not has_key_or_type_criteria or matches_key_or_type)
 
-    def get_filtered_entries(item_type_str: str, item_id: int) -> list[PracticeEntry]:
-        """Get practice entries with optional date filtering."""
-        query = db.query(PracticeEntry).filter(
-            PracticeEntry.item_type == item_type_str,
-            PracticeEntry.item_id == item_id,
-            PracticeEntry.was_practiced,
+    # Aggregate practiced entries per item, with optional date filtering
+    stats_stmt = select(
+        PracticeEntry.item_type,
+        PracticeEntry.item_id,
+        func.count().label("times_practiced"),
+        func.max(PracticeEntry.created_at).label("last_practiced"),
+        func.max(PracticeEntry.practiced_bpm).label("max_practiced_bpm"),
+    ).where(PracticeEntry.was_practiced)
+    if from_date:
+        stats_stmt = stats_stmt.where(PracticeEntry.created_at >= from_date)
+    if to_date:
+        # Add one day to include the entire end date
+        end_of_day = to_date + timedelta(days=1)
+        stats_stmt = stats_stmt.where(PracticeEntry.created_at < end_of_day)
+    stats = stats_stmt.group_by(PracticeEntry.item_type, PracticeEntry.item_id).cte(
+        "practiced_stats"
+    )
+
+    def detailed_select(model: type[Scale] | type[Arpeggio], item_type_str: str) -> Select:
+        """Select enabled items of one type with their practiced stats and filters."""
+        stmt = (
+            select(
+                literal(item_type_str).label("item_type"),
+                model.id,
+                model.note,
+                model.accidental,
+                model.type,
+                model.octaves,
+                model.target_bpm,
+                stats.c.times_practiced,
+                stats.c.last_practiced,
+                stats.c.max_practiced_bpm,
+            )
+            .outerjoin(
+                stats,
+                (stats.c.item_type == item_type_str) & (stats.c.item_id == model.id),
+            )
+            .where(model.enabled)
         )
-        if from_date:
-            query = query.filter(PracticeEntry.created_at >= from_date)
-        if to_date:
-            # Add one day to include the entire end date
-            end_of_day = to_date + timedelta(days=1)
-            query = query.filter(PracticeEntry.created_at < end_of_day)
-        return query.all()
-
-    # Get stats for scales
-    if item_type is None or item_type == "scale":
-        scales_query = db.query(Scale).filter(Scale.enabled)
         if subtype:
-            scales_query = scales_query.filter(Scale.type == subtype)
+            stmt = stmt.where(model.type == subtype)
         if note:
-            scales_query = scales_query.filter(Scale.note == note)
+            stmt = stmt.where(model.note == note)
         if accidental:
             if accidental == "natural":
-                scales_query = scales_query.filter(Scale.accidental.is_(None))
+                stmt = stmt.where(model.accidental.is_(None))
             else:
-                scales_query = scales_query.filter(Scale.accidental == accidental)
-        scales = scales_query.all()
-
-        for scale in scales:
-            entries = get_filtered_entries("scale", scale.id)
-            times_practiced = len(entries)
-            last_practiced = max((e.created_at for e in entries), default=None)
-            likelihood = likelihoods.get(("scale", scale.id), 0.0)
-
-            # Get max practiced BPM
-            max_practiced_bpm = None
-            bpm_entries = [e.practiced_bpm for e in entries if e.practiced_bpm is not None]
-            if bpm_entries:
-                max_practiced_bpm = max(bpm_entries)
-
-            history.append(
-                PracticeHistoryDetailedItem(
-                    item_type="scale",
-                    item_id=scale.id,
-                    display_name=scale.display_name(),
-                    subtype=scale.type,
-                    note=scale.note,
-                    accidental=scale.accidental,
-                    octaves=scale.octaves,
-                    times_practiced=times_practiced,
-                    last_practiced=last_practiced,
-                    selection_likelihood=likelihood,
-                    max_practiced_bpm=max_practiced_bpm,
-                    target_bpm=scale.target_bpm,
-                    is_weekly_focus=is_focus_item(scale.note, scale.type, "scale"),
-                )
-            )
+                stmt = stmt.where(model.accidental == accidental)
+        return stmt
 
-    # Get stats for arpeggios
+    # Scales and arpeggios come back from one UNION ALL query
+    selects = []
+    if item_type is None or item_type == "scale":
+        selects.append(detailed_select(Scale, "scale"))
     if item_type is None or item_type == "arpeggio":
-        arpeggios_query = db.query(Arpeggio).filter(Arpeggio.enabled)
-        if subtype:
-            arpeggios_query = arpeggios_query.filter(Arpeggio.type == subtype)
-        if note:
-            arpeggios_query = arpeggios_query.filter(Arpeggio.note == note)
-        if accidental:
-            if accidental == "natural":
-                arpeggios_query = arpeggios_query.filter(Arpeggio.accidental.is_(None))
-            else:
-                arpeggios_query = arpeggios_query.filter(Arpeggio.accidental == accidental)
-        arpeggios = arpeggios_query.all()
-
-        for arpeggio in arpeggios:
-            entries = get_filtered_entries("arpeggio", arpeggio.id)
-            times_practiced = len(entries)
-            last_practiced = max((e.created_at for e in entries), default=None)
-            likelihood = likelihoods.get(("arpeggio", arpeggio.id), 0.0)
-
-            # Get max practiced BPM
-            max_practiced_bpm = None
-            bpm_entries = [e.practiced_bpm for e in entries if e.practiced_bpm is not None]
-            if bpm_entries:
-                max_practiced_bpm = max(bpm_entries)
-
-            history.append(
-                PracticeHistoryDetailedItem(
-                    item_type="arpeggio",
-                    item_id=arpeggio.id,
-                    display_name=arpeggio.display_name(),
-                    subtype=arpeggio.type,
-                    note=arpeggio.note,
-                    accidental=arpeggio.accidental,
-                    octaves=arpeggio.octaves,
-                    times_practiced=times_practiced,
-                    last_practiced=last_practiced,
-                    selection_likelihood=likelihood,
-                    max_practiced_bpm=max_practiced_bpm,
-                    target_bpm=arpeggio.target_bpm,
-                    is_weekly_focus=is_focus_item(arpeggio.note, arpeggio.type, "arpeggio"),
-                )
+        selects.append(detailed_select(Arpeggio, "arpeggio"))
+    if not selects:
+        return history
+
+    for row in db.execute(union_all(*selects)):
+        if row.item_type == "scale":
+            display_name = scale_display_name(row.note, row.accidental, row.type, row.octaves)
+        else:
+            display_name = arpeggio_display_name(row.note, row.accidental, row.type, row.octaves)
+        history.append(
+            PracticeHistoryDetailedItem(
+                item_type=row.item_type,
+                item_id=row.id,
+                display_name=display_name,
+                subtype=row.type,
+                note=row.note,
+                accidental=row.accidental,
+                octaves=row.octaves,
+                times_practiced=row.times_practiced or 0,
+                last_practiced=row.last_practiced,
+                selection_likelihood=likelihoods.get((row.item_type, row.id), 0.0),
+                max_practiced_bpm=row.max_practiced_bpm,
+                target_bpm=row.target_bpm,
+                is_weekly_focus=is_focus_item(row.note, row.type, row.item_type),
             )
+        )
 
     return history
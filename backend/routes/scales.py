@@ -1,11 +1,12 @@
-from typing import Literal
+from typing import Literal, cast
 
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel, ConfigDict
-from sqlalchemy.orm import Session
+from pydantic import BaseModel, ConfigDict, computed_field
+from sqlalchemy import CursorResult, bindparam, update
+from sqlalchemy.orm import Session, load_only
 
 from database import get_db
-from models import Scale
+from models import Scale, scale_display_name
 from services.initializer import init_scales_and_arpeggios
 
 router = APIRouter()
@@ -21,9 +22,13 @@ class ScaleResponse(BaseModel):
     weight: float
     target_bpm: int | None
     articulation_mode: str
-    display_name: str
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def display_name(self) -> str:
+        return scale_display_name(self.note, self.accidental, self.type, self.octaves)
 
 
 class ScaleUpdate(BaseModel):
@@ -38,8 +43,17 @@ class BulkEnableRequest(BaseModel):
     enabled: bool
 
 
+# Built once: the expanding IN parameter keeps one cached statement for any number of ids
+_BULK_ENABLE_STMT = (
+    update(Scale)
+    .where(Scale.id.in_(bindparam("ids", expanding=True)))
+    .values(enabled=bindparam("enable"))
+    .execution_options(synchronize_session=False)
+)
+
+
 @router.get("/scales", response_model=list[ScaleResponse])
-async def get_scales(
+def get_scales(
     note: str | None = None,
     type: str | None = None,
     octaves: int | None = None,
@@ -47,7 +61,20 @@ async def get_scales(
     db: Session = Depends(get_db),
 ):
     """Get all scales with optional filtering."""
-    query = db.query(Scale)
+    # Only load the columns ScaleResponse needs
+    query = db.query(Scale).options(
+        load_only(
+            Scale.id,
+            Scale.note,
+            Scale.accidental,
+            Scale.type,
+            Scale.octaves,
+            Scale.enabled,
+            Scale.weight,
+            Scale.target_bpm,
+            Scale.articulation_mode,
+        )
+    )
 
     if note:
         query = query.filter(Scale.note == note)
@@ -60,25 +87,11 @@ async def get_scales(
 
     scales = query.order_by(Scale.note, Scale.accidental, Scale.type, Scale.octaves).all()
 
-    return [
-        ScaleResponse(
-            id=s.id,
-            note=s.note,
-            accidental=s.accidental,
-            type=s.type,
-            octaves=s.octaves,
-            enabled=s.enabled,
-            weight=s.weight,
-            target_bpm=s.target_bpm,
-            articulation_mode=s.articulation_mode,
-            display_name=s.display_name(),
-        )
-        for s in scales
-    ]
+    return [ScaleResponse.model_validate(s) for s in scales]
 
 
 @router.put("/scales/{scale_id}", response_model=ScaleResponse)
-async def update_scale(scale_id: int, update: ScaleUpdate, db: Session = Depends(get_db)):
+def update_scale(scale_id: int, update: ScaleUpdate, db: Session = Depends(get_db)):
     """Update a scale's enabled status or weight."""
     scale = db.query(Scale).filter(Scale.id == scale_id).first()
     if not scale:
@@ -97,34 +110,22 @@ async def update_scale(scale_id: int, update: ScaleUpdate, db: Session = Depends
     db.commit()
     db.refresh(scale)
 
-    return ScaleResponse(
-        id=scale.id,
-        note=scale.note,
-        accidental=scale.accidental,
-        type=scale.type,
-        octaves=scale.octaves,
-        enabled=scale.enabled,
-        weight=scale.weight,
-        target_bpm=scale.target_bpm,
-        articulation_mode=scale.articulation_mode,
-        display_name=scale.display_name(),
-    )
+    return ScaleResponse.model_validate(scale)
 
 
 @router.post("/scales/bulk-enable")
-async def bulk_enable_scales(request: BulkEnableRequest, db: Session = Depends(get_db)):
+def bulk_enable_scales(request: BulkEnableRequest, db: Session = Depends(get_db)):
     """Enable or disable multiple scales at once."""
-    updated = (
-        db.query(Scale)
-        .filter(Scale.id.in_(request.ids))
-        .update({"enabled": request.enabled}, synchronize_session=False)
+    result = cast(
+        CursorResult,
+        db.execute(_BULK_ENABLE_STMT, {"ids": request.ids, "enable": request.enabled}),
     )
     db.commit()
-    return {"updated": updated}
+    return {"updated": result.rowcount}
 
 
 @router.post("/init-database")
-async def initialize_database(db: Session = Depends(get_db)):
+def initialize_database(db: Session = Depends(get_db)):
     """Initialize the database with all scale and arpeggio combinations."""
     result = init_scales_and_arpeggios(db)
     return result
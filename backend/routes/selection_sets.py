@@ -3,8 +3,10 @@
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel, field_validator
-from sqlalchemy.orm import Session
+from pydantic import BaseModel, ConfigDict, field_validator
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, raiseload
 
 from database import get_db
 from models import Arpeggio, Scale, SelectionSet
@@ -46,53 +48,59 @@ class SelectionSetResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 @router.get("/selection-sets", response_model=list[SelectionSetResponse])
-async def list_selection_sets(db: Session = Depends(get_db)):
+def list_selection_sets(db: Session = Depends(get_db)):
     """List all saved selection sets."""
-    sets = db.query(SelectionSet).order_by(SelectionSet.name).all()
-    return sets
+    # raiseload: fail fast if serialization ever touches an unloaded relationship
+    sets = db.query(SelectionSet).options(raiseload("*")).order_by(SelectionSet.name).all()
+    return [SelectionSetResponse.model_validate(s) for s in sets]
 
 
 @router.post("/selection-sets", response_model=SelectionSetResponse)
-async def create_selection_set(request: SelectionSetCreate, db: Session = Depends(get_db)):
+def create_selection_set(request: SelectionSetCreate, db: Session = Depends(get_db)):
     """Save the current selection (enabled scales/arpeggios) as a new named set."""
-    # Check for duplicate name
-    existing = db.query(SelectionSet).filter(SelectionSet.name == request.name).first()
-    if existing:
+    # One statement: capture the currently enabled ids as JSON arrays in SQL and
+    # insert, letting the unique name constraint detect duplicates atomically
+    stmt = (
+        sqlite_insert(SelectionSet)
+        .values(
+            name=request.name,
+            scale_ids=select(func.json_group_array(Scale.id))
+            .where(Scale.enabled)
+            .scalar_subquery(),
+            arpeggio_ids=select(func.json_group_array(Arpeggio.id))
+            .where(Arpeggio.enabled)
+            .scalar_subquery(),
+        )
+        .on_conflict_do_nothing(index_elements=["name"])
+        .returning(SelectionSet)
+    )
+    selection_set = db.scalars(stmt).one_or_none()
+    if selection_set is None:
         raise HTTPException(
             status_code=409, detail=f"Selection set '{request.name}' already exists"
         )
 
-    # Capture currently enabled scale and arpeggio IDs
-    enabled_scale_ids = [s.id for s in db.query(Scale).filter(Scale.enabled).all()]
-    enabled_arpeggio_ids = [a.id for a in db.query(Arpeggio).filter(Arpeggio.enabled).all()]
-
-    selection_set = SelectionSet(
-        name=request.name,
-        scale_ids=enabled_scale_ids,
-        arpeggio_ids=enabled_arpeggio_ids,
-    )
-    db.add(selection_set)
+    response = SelectionSetResponse.model_validate(selection_set)
     db.commit()
-    db.refresh(selection_set)
-    return selection_set
+    return response
 
 
 @router.get("/selection-sets/active", response_model=SelectionSetResponse | None)
-async def get_active_selection_set(db: Session = Depends(get_db)):
+def get_active_selection_set(db: Session = Depends(get_db)):
     """Get the currently active selection set, or null if none is active."""
-    active = db.query(SelectionSet).filter(SelectionSet.is_active).first()
+    # Served from the partial unique index on is_active
+    active = db.execute(
+        select(SelectionSet).where(SelectionSet.is_active).limit(1)
+    ).scalar_one_or_none()
     return active
 
 
 @router.put("/selection-sets/{set_id}", response_model=SelectionSetResponse)
-async def update_selection_set(
-    set_id: int, request: SelectionSetUpdate, db: Session = Depends(get_db)
-):
+def update_selection_set(set_id: int, request: SelectionSetUpdate, db: Session = Depends(get_db)):
     """Update a selection set's name or selection."""
     selection_set = db.query(SelectionSet).filter(SelectionSet.id == set_id).first()
     if not selection_set:
@@ -114,23 +122,22 @@ async def update_selection_set(
 
     if request.update_from_current:
         # Capture currently enabled items
-        selection_set.scale_ids = [s.id for s in db.query(Scale).filter(Scale.enabled).all()]
-        selection_set.arpeggio_ids = [
-            a.id for a in db.query(Arpeggio).filter(Arpeggio.enabled).all()
-        ]
+        selection_set.scale_ids = list(db.scalars(select(Scale.id).where(Scale.enabled)))
+        selection_set.arpeggio_ids = list(db.scalars(select(Arpeggio.id).where(Arpeggio.enabled)))
     else:
         if request.scale_ids is not None:
             selection_set.scale_ids = request.scale_ids
         if request.arpeggio_ids is not None:
             selection_set.arpeggio_ids = request.arpeggio_ids
 
+    db.flush()
+    response = SelectionSetResponse.model_validate(selection_set)
     db.commit()
-    db.refresh(selection_set)
-    return selection_set
+    return response
 
 
 @router.delete("/selection-sets/{set_id}")
-async def delete_selection_set(set_id: int, db: Session = Depends(get_db)):
+def delete_selection_set(set_id: int, db: Session = Depends(get_db)):
     """Delete a selection set."""
     selection_set = db.query(SelectionSet).filter(SelectionSet.id == set_id).first()
     if not selection_set:
@@ -142,49 +149,53 @@ async def delete_selection_set(set_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/selection-sets/deactivate")
-async def deactivate_selection_sets(db: Session = Depends(get_db)):
+def deactivate_selection_sets(db: Session = Depends(get_db)):
     """Deactivate all selection sets and disable all scales/arpeggios."""
     db.query(SelectionSet).filter(SelectionSet.is_active).update(
         {"is_active": False}, synchronize_session=False
     )
-    db.query(Scale).update({"enabled": False}, synchronize_session=False)
-    db.query(Arpeggio).update({"enabled": False}, synchronize_session=False)
+    db.query(Scale).filter(Scale.enabled).update({"enabled": False}, synchronize_session=False)
+    db.query(Arpeggio).filter(Arpeggio.enabled).update(
+        {"enabled": False}, synchronize_session=False
+    )
     db.commit()
     return {"message": "All selection sets deactivated, all items disabled"}
 
 
 @router.post("/selection-sets/{set_id}/load")
-async def load_selection_set(set_id: int, db: Session = Depends(get_db)):
+def load_selection_set(set_id: int, db: Session = Depends(get_db)):
     """Load a selection set: enable its items, disable others, mark as active."""
     selection_set = db.query(SelectionSet).filter(SelectionSet.id == set_id).first()
     if not selection_set:
         raise HTTPException(status_code=404, detail="Selection set not found")
 
-    # Deactivate all other selection sets
-    db.query(SelectionSet).filter(SelectionSet.is_active).update(
+    # Deactivate the other active set first; the unique index allows only one.
+    # Leaving this set untouched keeps reloading the active set a no-op.
+    db.query(SelectionSet).filter(SelectionSet.is_active, SelectionSet.id != set_id).update(
         {"is_active": False}, synchronize_session=False
     )
 
-    # Disable all scales and arpeggios first
-    db.query(Scale).update({"enabled": False}, synchronize_session=False)
-    db.query(Arpeggio).update({"enabled": False}, synchronize_session=False)
-
-    # Enable the scales and arpeggios in this set
-    scales_enabled = 0
-    if selection_set.scale_ids:
-        scales_enabled = (
-            db.query(Scale)
-            .filter(Scale.id.in_(selection_set.scale_ids))
-            .update({"enabled": True}, synchronize_session=False)
-        )
-
-    arpeggios_enabled = 0
-    if selection_set.arpeggio_ids:
-        arpeggios_enabled = (
-            db.query(Arpeggio)
-            .filter(Arpeggio.id.in_(selection_set.arpeggio_ids))
-            .update({"enabled": True}, synchronize_session=False)
-        )
+    # Enable the items in this set and disable all others, one UPDATE per table.
+    # Only rows that are enabled or in the set can change, and RETURNING the new
+    # flag tells how many items were enabled without a separate count query.
+    scales_enabled = sum(
+        db.execute(
+            update(Scale)
+            .where(or_(Scale.enabled, Scale.id.in_(selection_set.scale_ids)))
+            .values(enabled=Scale.id.in_(selection_set.scale_ids))
+            .returning(Scale.enabled)
+            .execution_options(synchronize_session=False)
+        ).scalars()
+    )
+    arpeggios_enabled = sum(
+        db.execute(
+            update(Arpeggio)
+            .where(or_(Arpeggio.enabled, Arpeggio.id.in_(selection_set.arpeggio_ids)))
+            .values(enabled=Arpeggio.id.in_(selection_set.arpeggio_ids))
+            .returning(Arpeggio.enabled)
+            .execution_options(synchronize_session=False)
+        ).scalars()
+    )
 
     # Mark this set as active
     selection_set.is_active = True
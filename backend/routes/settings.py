@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 
 from database import get_db
 from models import DEFAULT_ALGORITHM_CONFIG, Setting
+from services.algorithm_config import get_algorithm_settings
 
 router = APIRouter()
 
@@ -19,19 +20,15 @@ class AlgorithmConfigUpdate(BaseModel):
 
 
 @router.get("/settings/algorithm", response_model=AlgorithmConfigResponse)
-async def get_algorithm_config(db: Session = Depends(get_db)):
+def get_algorithm_config(db: Session = Depends(get_db)):
     """Get the current selection algorithm configuration."""
-    setting = db.query(Setting).filter(Setting.key == "selection_algorithm").first()
-
-    if not setting:
-        # Return default config if not set
-        return AlgorithmConfigResponse(config=DEFAULT_ALGORITHM_CONFIG)
-
-    return AlgorithmConfigResponse(config=setting.value)
+    # Returned as stored (the default config if not set); sections are only
+    # parsed where they are used
+    return AlgorithmConfigResponse(config=get_algorithm_settings(db).config)
 
 
 @router.put("/settings/algorithm", response_model=AlgorithmConfigResponse)
-async def update_algorithm_config(update: AlgorithmConfigUpdate, db: Session = Depends(get_db)):
+def update_algorithm_config(update: AlgorithmConfigUpdate, db: Session = Depends(get_db)):
     """Update the selection algorithm configuration."""
     setting = db.query(Setting).filter(Setting.key == "selection_algorithm").first()
 
@@ -48,7 +45,7 @@ async def update_algorithm_config(update: AlgorithmConfigUpdate, db: Session = D
 
 
 @router.post("/settings/algorithm/reset", response_model=AlgorithmConfigResponse)
-async def reset_algorithm_config(db: Session = Depends(get_db)):
+def reset_algorithm_config(db: Session = Depends(get_db)):
     """Reset the selection algorithm configuration to defaults."""
     setting = db.query(Setting).filter(Setting.key == "selection_algorithm").first()
 
@@ -0,0 +1,78 @@
+from dataclasses import dataclass
+from datetime import datetime
+from functools import cached_property
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict, ValidationError
+from sqlalchemy.orm import Session
+
+from models import DEFAULT_ALGORITHM_CONFIG, Setting
+
+
+class WeeklyFocusConfig(BaseModel):
+    enabled: bool = False
+    keys: frozenset[str] = frozenset()
+    types: frozenset[str] = frozenset()
+    categories: frozenset[str] = frozenset()
+    probability_increase: float = 80
+
+    model_config = ConfigDict(frozen=True)
+
+
+def parse_weekly_focus(value: Any) -> WeeklyFocusConfig:
+    """Parse the weekly_focus section of the algorithm config.
+
+    The settings endpoint stores any config as given, so a missing or invalid
+    section falls back to the defaults (weekly focus disabled) instead of failing.
+    """
+    try:
+        return WeeklyFocusConfig.model_validate(value or {})
+    except ValidationError:
+        return WeeklyFocusConfig()
+
+
+@dataclass(frozen=True)
+class AlgorithmSettings:
+    """The stored algorithm config, with sections parsed on first use."""
+
+    config: dict[str, Any]
+
+    @cached_property
+    def weekly_focus(self) -> WeeklyFocusConfig:
+        return parse_weekly_focus(self.config.get("weekly_focus"))
+
+
+DEFAULT_ALGORITHM_SETTINGS = AlgorithmSettings(DEFAULT_ALGORITHM_CONFIG)
+
+# Settings keyed by the setting row's updated_at, which every write bumps
+_algorithm_settings_cache: tuple[datetime, AlgorithmSettings] | None = None
+
+
+def clear_algorithm_settings_cache() -> None:
+    """Drop the cached settings."""
+    global _algorithm_settings_cache
+    _algorithm_settings_cache = None
+
+
+def get_algorithm_settings(db: Session) -> AlgorithmSettings:
+    """Get the current algorithm settings, re-reading the value only when it changes."""
+    global _algorithm_settings_cache
+    version = db.query(Setting.updated_at).filter(Setting.key == "selection_algorithm").scalar()
+    if version is None:
+        return DEFAULT_ALGORITHM_SETTINGS
+    cached = _algorithm_settings_cache
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    # Cache the value under the updated_at read with it, so a write that lands
+    # between the two queries can never leave a stale value under a newer key
+    row = (
+        db.query(Setting.updated_at, Setting.value)
+        .filter(Setting.key == "selection_algorithm")
+        .first()
+    )
+    if row is None:
+        return DEFAULT_ALGORITHM_SETTINGS
+    settings = AlgorithmSettings(dict(row.value))
+    _algorithm_settings_cache = (row.updated_at, settings)
+    return settings
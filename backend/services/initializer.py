@@ -1,14 +1,51 @@
+from itertools import product
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
-from models import DEFAULT_ALGORITHM_CONFIG, Arpeggio, Scale, SchemaVersion, Setting
+from models import (
+    ACCIDENTALS,
+    ARPEGGIO_OCTAVES,
+    ARPEGGIO_TYPES,
+    DEFAULT_ALGORITHM_CONFIG,
+    NOTES,
+    SCALE_OCTAVES,
+    SCALE_TYPES,
+    Arpeggio,
+    Scale,
+    SchemaVersion,
+    Setting,
+)
 from services.migrations import CURRENT_SCHEMA_VERSION, MIGRATIONS, run_migrations
 
-NOTES = ["A", "B", "C", "D", "E", "F", "G"]
-ACCIDENTALS = [None, "flat", "sharp"]
-SCALE_TYPES = ["major", "minor_harmonic", "minor_melodic", "chromatic"]
-SCALE_OCTAVES = [1, 2, 3]
-ARPEGGIO_TYPES = ["major", "minor", "diminished", "dominant"]
-ARPEGGIO_OCTAVES = [1, 2, 3]
+# Rows for every catalog combination, built once at import
+SCALE_ROWS = [
+    {
+        "note": note,
+        "accidental": accidental,
+        "type": scale_type,
+        "octaves": octaves,
+        "enabled": False,
+        "weight": 1.0,
+    }
+    for note, accidental, scale_type, octaves in product(
+        NOTES, ACCIDENTALS, SCALE_TYPES, SCALE_OCTAVES
+    )
+]
+ARPEGGIO_ROWS = [
+    {
+        "note": note,
+        "accidental": accidental,
+        "type": arpeggio_type,
+        "octaves": octaves,
+        "enabled": False,
+        "weight": 1.0,
+    }
+    for note, accidental, arpeggio_type, octaves in product(
+        NOTES, ACCIDENTALS, ARPEGGIO_TYPES, ARPEGGIO_OCTAVES
+    )
+]
 
 
 def init_scales_and_arpeggios(db: Session) -> dict:
@@ -24,9 +61,13 @@ def init_scales_and_arpeggios(db: Session) -> dict:
     # because models may reference columns that don't exist yet
     migration_result = run_migrations(db)
 
-    # Check if already initialized
-    existing_scales = db.query(Scale).count()
-    existing_arpeggios = db.query(Arpeggio).count()
+    # Check if already initialized (both counts in one round trip)
+    existing_scales, existing_arpeggios = db.execute(
+        select(
+            select(func.count()).select_from(Scale).scalar_subquery(),
+            select(func.count()).select_from(Arpeggio).scalar_subquery(),
+        )
+    ).one()
 
     if existing_scales > 0 or existing_arpeggios > 0:
         return {
@@ -36,59 +77,28 @@ def init_scales_and_arpeggios(db: Session) -> dict:
             "migrations": migration_result,
         }
 
-    scales_created = 0
-    arpeggios_created = 0
+    # Create all combinations with one batched INSERT per table. render_nulls keeps
+    # rows with and without an accidental in the same batch.
+    db.execute(insert(Scale).execution_options(render_nulls=True), SCALE_ROWS)
+    db.execute(insert(Arpeggio).execution_options(render_nulls=True), ARPEGGIO_ROWS)
 
-    # Create all scale combinations
-    for note in NOTES:
-        for accidental in ACCIDENTALS:
-            for scale_type in SCALE_TYPES:
-                for octaves in SCALE_OCTAVES:
-                    scale = Scale(
-                        note=note,
-                        accidental=accidental,
-                        type=scale_type,
-                        octaves=octaves,
-                        enabled=False,
-                        weight=1.0,
-                    )
-                    db.add(scale)
-                    scales_created += 1
-
-    # Create all arpeggio combinations
-    for note in NOTES:
-        for accidental in ACCIDENTALS:
-            for arpeggio_type in ARPEGGIO_TYPES:
-                for octaves in ARPEGGIO_OCTAVES:
-                    arpeggio = Arpeggio(
-                        note=note,
-                        accidental=accidental,
-                        type=arpeggio_type,
-                        octaves=octaves,
-                        enabled=False,
-                        weight=1.0,
-                    )
-                    db.add(arpeggio)
-                    arpeggios_created += 1
-
-    # Initialize default algorithm settings if not present
-    existing_setting = db.query(Setting).filter(Setting.key == "selection_algorithm").first()
-    if not existing_setting:
-        setting = Setting(key="selection_algorithm", value=DEFAULT_ALGORITHM_CONFIG)
-        db.add(setting)
-
-    # Record schema version for fresh database
-    schema_version = SchemaVersion(
-        version=CURRENT_SCHEMA_VERSION,
-        description=MIGRATIONS[CURRENT_SCHEMA_VERSION],
+    # Default algorithm settings and the schema version, skipped if already present
+    db.execute(
+        sqlite_insert(Setting)
+        .values(key="selection_algorithm", value=DEFAULT_ALGORITHM_CONFIG)
+        .on_conflict_do_nothing(index_elements=["key"])
+    )
+    db.execute(
+        sqlite_insert(SchemaVersion)
+        .values(version=CURRENT_SCHEMA_VERSION, description=MIGRATIONS[CURRENT_SCHEMA_VERSION])
+        .on_conflict_do_nothing(index_elements=["version"])
     )
-    db.add(schema_version)
 
     db.commit()
 
     return {
         "message": "Database initialized successfully",
-        "scales": scales_created,
-        "arpeggios": arpeggios_created,
+        "scales": len(SCALE_ROWS),
+        "arpeggios": len(ARPEGGIO_ROWS),
         "schema_version": CURRENT_SCHEMA_VERSION,
     }
@@ -2,16 +2,44 @@
 
 This module provides a lightweight migration system for upgrading the database
 schema without losing existing data. Migrations are idempotent and can be
-safely run multiple times.
+safely run multiple times. They do not commit themselves: run_migrations
+records all applied versions and commits them with the migrations at once.
 """
 
-from sqlalchemy import inspect, text
+from collections.abc import Callable
+from itertools import product
+from typing import cast
+
+from sqlalchemy import (
+    CursorResult,
+    String,
+    column,
+    exists,
+    func,
+    insert,
+    inspect,
+    literal,
+    or_,
+    select,
+    text,
+    update,
+    values,
+)
 from sqlalchemy.orm import Session
 
-from models import DEFAULT_ALGORITHM_CONFIG, Arpeggio, SchemaVersion, Setting
+from models import (
+    ACCIDENTALS,
+    ARPEGGIO_TYPES,
+    DEFAULT_ALGORITHM_CONFIG,
+    NOTES,
+    Arpeggio,
+    SchemaVersion,
+    Setting,
+)
 
-# Current schema version - increment when adding new migrations
-CURRENT_SCHEMA_VERSION = 9
+# Current schema version - increment when adding new migrations (and register
+# the new step in MIGRATIONS and MIGRATION_STEPS)
+CURRENT_SCHEMA_VERSION = 13
 
 # Migration definitions
 MIGRATIONS = {
@@ -24,12 +52,18 @@ MIGRATIONS = {
     7: "Adjust default metronome and drone gain levels",
     8: "Add selection_sets table and selection_set_id to practice_sessions",
     9: "Add articulation_mode column to scales and arpeggios",
+    10: "Add indexes on practice_entries item and session columns",
+    11: "Add partial index on active selection sets",
+    12: "Allow at most one active selection set",
+    13: "Cover practice stats queries with a practice_entries index",
 }
 
-# Constants for arpeggio generation (must match initializer.py)
-NOTES = ["A", "B", "C", "D", "E", "F", "G"]
-ACCIDENTALS = [None, "flat", "sharp"]
-ARPEGGIO_TYPES = ["major", "minor", "diminished", "dominant"]
+
+# Built once: the version lookup runs on every startup, even when nothing is pending
+_VERSION_TABLE_EXISTS_STMT = text(
+    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_versions'"
+)
+_CURRENT_VERSION_STMT = text("SELECT MAX(version) FROM schema_versions")
 
 
 def get_current_version(db: Session) -> int:
@@ -38,63 +72,77 @@ def get_current_version(db: Session) -> int:
     Returns 0 if the schema_versions table doesn't exist or is empty
     (indicating an unversioned database).
     """
-    inspector = inspect(db.get_bind())
-
-    # Check if schema_versions table exists
-    if "schema_versions" not in inspector.get_table_names():
+    # Look the table up in sqlite_master instead of running the inspector, and
+    # rather than catching OperationalError, which would also swallow errors such
+    # as "database is locked"
+    if db.scalar(_VERSION_TABLE_EXISTS_STMT) is None:
         return 0
 
-    # Get the highest version number
-    result = db.execute(text("SELECT MAX(version) FROM schema_versions")).scalar()
-
+    result = db.scalar(_CURRENT_VERSION_STMT)
     return result if result is not None else 0
 
 
-def record_migration(db: Session, version: int, description: str) -> None:
-    """Record a completed migration in the schema_versions table."""
-    migration = SchemaVersion(version=version, description=description)
-    db.add(migration)
-    db.commit()
-
+# Table name -> column names, as reflected before the migrations run
+SchemaSnapshot = dict[str, set[str]]
 
-def migrate_v0_to_v1(db: Session) -> int:
-    """Migration v0 → v1: Add 1-octave arpeggios.
 
-    This migration adds 1-octave versions for all arpeggio combinations
-    that only have 2 and 3 octave versions.
+def snapshot_schema(db: Session) -> SchemaSnapshot:
+    """Reflect the columns of every table in a single batched inspection.
 
-    Returns the number of arpeggios added.
+    Migrations add disjoint columns, so one snapshot taken before the
+    migration ladder stays valid for every step that consults it.
     """
-    added_count = 0
-
-    # Get all existing 1-octave arpeggios to check what already exists
-    existing_one_octave = set()
-    one_octave_arpeggios = db.query(Arpeggio).filter(Arpeggio.octaves == 1).all()
-    for arp in one_octave_arpeggios:
-        existing_one_octave.add((arp.note, arp.accidental, arp.type))
-
-    # Add missing 1-octave arpeggios
-    for note in NOTES:
-        for accidental in ACCIDENTALS:
-            for arpeggio_type in ARPEGGIO_TYPES:
-                key = (note, accidental, arpeggio_type)
-                if key not in existing_one_octave:
-                    arpeggio = Arpeggio(
-                        note=note,
-                        accidental=accidental,
-                        type=arpeggio_type,
-                        octaves=1,
-                        enabled=False,
-                        weight=1.0,
-                    )
-                    db.add(arpeggio)
-                    added_count += 1
+    columns = inspect(db.get_bind()).get_multi_columns()
+    return {table: {col["name"] for col in cols} for (_, table), cols in columns.items()}
 
-    db.commit()
-    return added_count
 
+def migrate_v0_to_v1(db: Session, schema: SchemaSnapshot | None = None) -> dict:
+    """Migration v0 → v1: Add 1-octave arpeggios.
+
+    This migration adds 1-octave versions for all arpeggio combinations
+    that only have 2 and 3 octave versions, as a single INSERT ... SELECT
+    over the missing combinations.
 
-def migrate_v1_to_v2(db: Session) -> dict:
+    Returns dict with the number of arpeggios added.
+    """
+    desired = (
+        values(
+            column("note", String),
+            column("accidental", String),
+            column("type", String),
+            name="desired",
+        )
+        .data(list(product(NOTES, ACCIDENTALS, ARPEGGIO_TYPES)))
+        .cte()
+    )
+
+    already_present = exists().where(
+        Arpeggio.note == desired.c.note,
+        Arpeggio.accidental.is_not_distinct_from(desired.c.accidental),
+        Arpeggio.type == desired.c.type,
+        Arpeggio.octaves == 1,
+    )
+    missing = select(
+        desired.c.note,
+        desired.c.accidental,
+        desired.c.type,
+        literal(1),
+        literal(False),
+        literal(1.0),
+    ).where(~already_present)
+
+    # Remaining columns (created_at, articulation_mode) take their model defaults.
+    # RETURNING counts the rows: sqlite3 reports no rowcount for WITH ... INSERT.
+    added = db.execute(
+        insert(Arpeggio)
+        .from_select(["note", "accidental", "type", "octaves", "enabled", "weight"], missing)
+        .returning(Arpeggio.id)
+    ).all()
+
+    return {"arpeggios_added": len(added)}
+
+
+def migrate_v1_to_v2(db: Session, schema: SchemaSnapshot | None = None) -> dict:
     """Migration v1 → v2: Add articulation columns to practice_entries.
 
     Adds three columns:
@@ -104,8 +152,8 @@ def migrate_v1_to_v2(db: Session) -> dict:
 
     Returns dict with columns added.
     """
-    inspector = inspect(db.get_bind())
-    existing_columns = {col["name"] for col in inspector.get_columns("practice_entries")}
+    schema = schema if schema is not None else snapshot_schema(db)
+    existing_columns = schema["practice_entries"]
 
     columns_added = []
 
@@ -128,19 +176,18 @@ def migrate_v1_to_v2(db: Session) -> dict:
         )
         columns_added.append("practiced_separate")
 
-    db.commit()
     return {"columns_added": columns_added}
 
 
-def migrate_v2_to_v3(db: Session) -> dict:
+def migrate_v2_to_v3(db: Session, schema: SchemaSnapshot | None = None) -> dict:
     """Migration v2 → v3: Add practiced_bpm column to practice_entries.
 
     Adds column for recording metronome BPM used during practice.
 
     Returns dict with columns added.
     """
-    inspector = inspect(db.get_bind())
-    existing_columns = {col["name"] for col in inspector.get_columns("practice_entries")}
+    schema = schema if schema is not None else snapshot_schema(db)
+    existing_columns = schema["practice_entries"]
 
     columns_added = []
 
@@ -149,11 +196,10 @@ def migrate_v2_to_v3(db: Session) -> dict:
         db.execute(text("ALTER TABLE practice_entries ADD COLUMN practiced_bpm INTEGER"))
         columns_added.append("practiced_bpm")
 
-    db.commit()
     return {"columns_added": columns_added}
 
 
-def migrate_v3_to_v4(db: Session) -> dict:
+def migrate_v3_to_v4(db: Session, schema: SchemaSnapshot | None = None) -> dict:
     """Migration v3 → v4: Add target_bpm column to scales and arpeggios.
 
     Adds column for setting target metronome BPM per scale/arpeggio.
@@ -161,34 +207,33 @@ def migrate_v3_to_v4(db: Session) -> dict:
 
     Returns dict with columns added.
     """
-    inspector = inspect(db.get_bind())
+    schema = schema if schema is not None else snapshot_schema(db)
     columns_added = []
 
     # Add target_bpm to scales
-    scale_columns = {col["name"] for col in inspector.get_columns("scales")}
+    scale_columns = schema["scales"]
     if "target_bpm" not in scale_columns:
         db.execute(text("ALTER TABLE scales ADD COLUMN target_bpm INTEGER"))
         columns_added.append("scales.target_bpm")
 
     # Add target_bpm to arpeggios
-    arpeggio_columns = {col["name"] for col in inspector.get_columns("arpeggios")}
+    arpeggio_columns = schema["arpeggios"]
     if "target_bpm" not in arpeggio_columns:
         db.execute(text("ALTER TABLE arpeggios ADD COLUMN target_bpm INTEGER"))
         columns_added.append("arpeggios.target_bpm")
 
-    db.commit()
     return {"columns_added": columns_added}
 
 
-def migrate_v4_to_v5(db: Session) -> dict:
+def migrate_v4_to_v5(db: Session, schema: SchemaSnapshot | None = None) -> dict:
     """Migration v4 → v5: Add target_bpm and matched_target_bpm to practice_entries.
 
     Adds columns for tracking target BPM at practice time and whether it matched.
 
     Returns dict with columns added.
     """
-    inspector = inspect(db.get_bind())
-    existing_columns = {col["name"] for col in inspector.get_columns("practice_entries")}
+    schema = schema if schema is not None else snapshot_schema(db)
+    existing_columns = schema["practice_entries"]
     columns_added = []
 
     if "target_bpm" not in existing_columns:
@@ -199,62 +244,81 @@ def migrate_v4_to_v5(db: Session) -> dict:
         db.execute(text("ALTER TABLE practice_entries ADD COLUMN matched_target_bpm BOOLEAN"))
         columns_added.append("matched_target_bpm")
 
-    db.commit()
     return {"columns_added": columns_added}
 
 
-def migrate_v5_to_v6(db: Session) -> dict:
+def migrate_v5_to_v6(db: Session, schema: SchemaSnapshot | None = None) -> dict:
     """Migration v5 → v6: Add metronome and drone gain settings to selection_algorithm.
 
     Updates the existing selection_algorithm setting to include default gain values
-    if they are missing.
+    if they are missing, patching the JSON value in place with json_insert.
 
     Returns dict with update status.
     """
-    existing_setting = db.query(Setting).filter(Setting.key == "selection_algorithm").first()
-    if not existing_setting:
-        return {"status": "skipped", "reason": "selection_algorithm setting not found"}
-
-    updated = False
-    config = existing_setting.value.copy()
-
-    if "metronome_gain" not in config:
-        config["metronome_gain"] = DEFAULT_ALGORITHM_CONFIG["metronome_gain"]
-        updated = True
-
-    if "drone_gain" not in config:
-        config["drone_gain"] = DEFAULT_ALGORITHM_CONFIG["drone_gain"]
-        updated = True
-
-    if updated:
-        existing_setting.value = config
-        db.commit()
+    result = cast(
+        CursorResult,
+        db.execute(
+            update(Setting)
+            .where(
+                Setting.key == "selection_algorithm",
+                or_(
+                    func.json_type(Setting.value, "$.metronome_gain").is_(None),
+                    func.json_type(Setting.value, "$.drone_gain").is_(None),
+                ),
+            )
+            # json_insert only adds keys that are not already present
+            .values(
+                value=func.json_insert(
+                    Setting.value,
+                    "$.metronome_gain",
+                    DEFAULT_ALGORITHM_CONFIG["metronome_gain"],
+                    "$.drone_gain",
+                    DEFAULT_ALGORITHM_CONFIG["drone_gain"],
+                )
+            )
+            .execution_options(synchronize_session=False)
+        ),
+    )
+    if result.rowcount:
         return {"status": "updated", "keys_added": ["metronome_gain", "drone_gain"]}
 
+    if not db.scalar(select(exists().where(Setting.key == "selection_algorithm"))):
+        return {"status": "skipped", "reason": "selection_algorithm setting not found"}
+
     return {"status": "already_up_to_date"}
 
 
-def migrate_v6_to_v7(db: Session) -> dict:
+def migrate_v6_to_v7(db: Session, schema: SchemaSnapshot | None = None) -> dict:
     """Migration v6 → v7: Adjust default metronome and drone gain levels.
 
     Updates the existing selection_algorithm setting with new balanced gain values.
 
     Returns dict with update status.
     """
-    existing_setting = db.query(Setting).filter(Setting.key == "selection_algorithm").first()
-    if not existing_setting:
+    result = cast(
+        CursorResult,
+        db.execute(
+            update(Setting)
+            .where(Setting.key == "selection_algorithm")
+            .values(
+                value=func.json_set(
+                    Setting.value,
+                    "$.metronome_gain",
+                    DEFAULT_ALGORITHM_CONFIG["metronome_gain"],
+                    "$.drone_gain",
+                    DEFAULT_ALGORITHM_CONFIG["drone_gain"],
+                )
+            )
+            .execution_options(synchronize_session=False)
+        ),
+    )
+    if not result.rowcount:
         return {"status": "skipped", "reason": "selection_algorithm setting not found"}
 
-    config = existing_setting.value.copy()
-    config["metronome_gain"] = DEFAULT_ALGORITHM_CONFIG["metronome_gain"]
-    config["drone_gain"] = DEFAULT_ALGORITHM_CONFIG["drone_gain"]
-
-    existing_setting.value = config
-    db.commit()
     return {"status": "updated", "keys_adjusted": ["metronome_gain", "drone_gain"]}
 
 
-def migrate_v7_to_v8(db: Session) -> dict:
+def migrate_v7_to_v8(db: Session, schema: SchemaSnapshot | None = None) -> dict:
     """Migration v7 -> v8: Add selection_sets table and selection_set_id to practice_sessions.
 
     Creates the selection_sets table for named presets and adds a foreign key
@@ -262,11 +326,11 @@ def migrate_v7_to_v8(db: Session) -> dict:
 
     Returns dict with tables/columns added.
     """
-    inspector = inspect(db.get_bind())
+    schema = schema if schema is not None else snapshot_schema(db)
     changes = []
 
     # Create selection_sets table if it doesn't exist
-    if "selection_sets" not in inspector.get_table_names():
+    if "selection_sets" not in schema:
         db.execute(
             text(
                 """
@@ -285,16 +349,15 @@ def migrate_v7_to_v8(db: Session) -> dict:
         changes.append("created selection_sets table")
 
     # Add selection_set_id to practice_sessions if not exists
-    existing_columns = {col["name"] for col in inspector.get_columns("practice_sessions")}
+    existing_columns = schema["practice_sessions"]
     if "selection_set_id" not in existing_columns:
         db.execute(text("ALTER TABLE practice_sessions ADD COLUMN selection_set_id INTEGER"))
         changes.append("added practice_sessions.selection_set_id")
 
-    db.commit()
     return {"changes": changes}
 
 
-def migrate_v8_to_v9(db: Session) -> dict:
+def migrate_v8_to_v9(db: Session, schema: SchemaSnapshot | None = None) -> dict:
     """Migration v8 -> v9: Add articulation_mode column to scales and arpeggios.
 
     Adds a column for per-item articulation preference:
@@ -304,27 +367,138 @@ def migrate_v8_to_v9(db: Session) -> dict:
 
     Returns dict with columns added.
     """
-    inspector = inspect(db.get_bind())
+    schema = schema if schema is not None else snapshot_schema(db)
     columns_added = []
 
     # Add articulation_mode to scales
-    scale_columns = {col["name"] for col in inspector.get_columns("scales")}
+    scale_columns = schema["scales"]
     if "articulation_mode" not in scale_columns:
         db.execute(text("ALTER TABLE scales ADD COLUMN articulation_mode VARCHAR DEFAULT 'both'"))
         columns_added.append("scales.articulation_mode")
 
     # Add articulation_mode to arpeggios
-    arpeggio_columns = {col["name"] for col in inspector.get_columns("arpeggios")}
+    arpeggio_columns = schema["arpeggios"]
     if "articulation_mode" not in arpeggio_columns:
         db.execute(
             text("ALTER TABLE arpeggios ADD COLUMN articulation_mode VARCHAR DEFAULT 'both'")
         )
         columns_added.append("arpeggios.articulation_mode")
 
-    db.commit()
     return {"columns_added": columns_added}
 
 
+def migrate_v9_to_v10(db: Session, schema: SchemaSnapshot | None = None) -> dict:
+    """Migration v9 -> v10: Add indexes on practice_entries.
+
+    Adds a composite index on (item_type, item_id), used by every per-item
+    practice lookup, and an index on session_id.
+
+    Returns dict with indexes ensured.
+    """
+    db.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_practice_entries_item "
+            "ON practice_entries (item_type, item_id)"
+        )
+    )
+    db.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_practice_entries_session "
+            "ON practice_entries (session_id)"
+        )
+    )
+
+    return {"indexes": ["ix_practice_entries_item", "ix_practice_entries_session"]}
+
+
+def migrate_v10_to_v11(db: Session, schema: SchemaSnapshot | None = None) -> dict:
+    """Migration v10 -> v11: Add a partial index on active selection sets.
+
+    Only the (at most one) active row is indexed, so looking up the active
+    selection set no longer scans the table.
+
+    Returns dict with indexes ensured.
+    """
+    db.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_selection_sets_active "
+            "ON selection_sets (is_active) WHERE is_active"
+        )
+    )
+
+    return {"indexes": ["ix_selection_sets_active"]}
+
+
+def migrate_v11_to_v12(db: Session, schema: SchemaSnapshot | None = None) -> dict:
+    """Migration v11 -> v12: Allow at most one active selection set.
+
+    Keeps only the most recently created active set active, then replaces the
+    plain partial index with a unique one so the database rejects a second
+    active set.
+
+    Returns dict with sets deactivated and indexes ensured.
+    """
+    result = cast(
+        CursorResult,
+        db.execute(
+            text(
+                "UPDATE selection_sets SET is_active = 0 WHERE is_active "
+                "AND id <> (SELECT MAX(id) FROM selection_sets WHERE is_active)"
+            )
+        ),
+    )
+    db.execute(text("DROP INDEX IF EXISTS ix_selection_sets_active"))
+    db.execute(
+        text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ix_selection_sets_one_active "
+            "ON selection_sets (is_active) WHERE is_active"
+        )
+    )
+
+    return {"sets_deactivated": result.rowcount, "indexes": ["ix_selection_sets_one_active"]}
+
+
+def migrate_v12_to_v13(db: Session, schema: SchemaSnapshot | None = None) -> dict:
+    """Migration v12 -> v13: Cover practice stats queries with an index.
+
+    Replaces the (item_type, item_id) index with one that also holds
+    was_practiced and created_at, so the per-item practice count and last
+    practice time are aggregated from the index alone. Lookups by
+    (item_type, item_id) keep using its leading columns.
+
+    Returns dict with indexes ensured.
+    """
+    db.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_practice_entries_item_stats "
+            "ON practice_entries (item_type, item_id, was_practiced, created_at)"
+        )
+    )
+    db.execute(text("DROP INDEX IF EXISTS ix_practice_entries_item"))
+
+    return {"indexes": ["ix_practice_entries_item_stats"]}
+
+
+# Migration steps by target version, applied in ascending order by run_migrations.
+# Every step takes (db, schema) and receives the shared schema snapshot (None once
+# v9 has been applied); steps that do not inspect columns ignore it.
+MIGRATION_STEPS: dict[int, Callable[[Session, SchemaSnapshot | None], dict]] = {
+    1: migrate_v0_to_v1,
+    2: migrate_v1_to_v2,
+    3: migrate_v2_to_v3,
+    4: migrate_v3_to_v4,
+    5: migrate_v4_to_v5,
+    6: migrate_v5_to_v6,
+    7: migrate_v6_to_v7,
+    8: migrate_v7_to_v8,
+    9: migrate_v8_to_v9,
+    10: migrate_v9_to_v10,
+    11: migrate_v10_to_v11,
+    12: migrate_v11_to_v12,
+    13: migrate_v12_to_v13,
+}
+
+
 def run_migrations(db: Session) -> dict:
     """Run all pending migrations.
 
@@ -341,114 +515,31 @@ def run_migrations(db: Session) -> dict:
         "migrations_applied": migrations_applied,
     }
 
-    # Apply each pending migration in order
-    if current_version < 1:
-        added = migrate_v0_to_v1(db)
-        record_migration(db, 1, MIGRATIONS[1])
-        migrations_applied.append(
-            {
-                "version": 1,
-                "description": MIGRATIONS[1],
-                "arpeggios_added": added,
-            }
-        )
-        current_version = 1
+    # Steady state: nothing pending, skip the schema snapshot and the ladder
+    if current_version >= CURRENT_SCHEMA_VERSION:
+        return results
 
-    if current_version < 2:
-        result = migrate_v1_to_v2(db)
-        record_migration(db, 2, MIGRATIONS[2])
-        migrations_applied.append(
-            {
-                "version": 2,
-                "description": MIGRATIONS[2],
-                **result,
-            }
-        )
-        current_version = 2
-
-    if current_version < 3:
-        result = migrate_v2_to_v3(db)
-        record_migration(db, 3, MIGRATIONS[3])
-        migrations_applied.append(
-            {
-                "version": 3,
-                "description": MIGRATIONS[3],
-                **result,
-            }
-        )
-        current_version = 3
+    # Reflect all table columns once for the migrations (up to v9) that inspect them
+    schema = snapshot_schema(db) if current_version < 9 else None
 
-    if current_version < 4:
-        result = migrate_v3_to_v4(db)
-        record_migration(db, 4, MIGRATIONS[4])
-        migrations_applied.append(
-            {
-                "version": 4,
-                "description": MIGRATIONS[4],
-                **result,
-            }
-        )
-        current_version = 4
-
-    if current_version < 5:
-        result = migrate_v4_to_v5(db)
-        record_migration(db, 5, MIGRATIONS[5])
-        migrations_applied.append(
-            {
-                "version": 5,
-                "description": MIGRATIONS[5],
-                **result,
-            }
-        )
-        current_version = 5
-
-    if current_version < 6:
-        result = migrate_v5_to_v6(db)
-        record_migration(db, 6, MIGRATIONS[6])
-        migrations_applied.append(
-            {
-                "version": 6,
-                "description": MIGRATIONS[6],
-                **result,
-            }
-        )
-        current_version = 6
-
-    if current_version < 7:
-        result = migrate_v6_to_v7(db)
-        record_migration(db, 7, MIGRATIONS[7])
-        migrations_applied.append(
-            {
-                "version": 7,
-                "description": MIGRATIONS[7],
-                **result,
-            }
-        )
-        current_version = 7
-
-    if current_version < 8:
-        result = migrate_v7_to_v8(db)
-        record_migration(db, 8, MIGRATIONS[8])
+    # Apply each pending migration in order
+    for version in range(current_version + 1, CURRENT_SCHEMA_VERSION + 1):
+        result = MIGRATION_STEPS[version](db, schema)
         migrations_applied.append(
             {
-                "version": 8,
-                "description": MIGRATIONS[8],
+                "version": version,
+                "description": MIGRATIONS[version],
                 **result,
             }
         )
-        current_version = 8
+        current_version = version
 
-    if current_version < 9:
-        result = migrate_v8_to_v9(db)
-        record_migration(db, 9, MIGRATIONS[9])
-        migrations_applied.append(
-            {
-                "version": 9,
-                "description": MIGRATIONS[9],
-                **result,
-            }
-        )
-        current_version = 9
+    # Record every applied version with one batched INSERT, committed with the ladder
+    db.execute(
+        insert(SchemaVersion),
+        [{"version": m["version"], "description": m["description"]} for m in migrations_applied],
+    )
+    db.commit()
 
     results["final_version"] = current_version
     return results
@@ -1,102 +1,130 @@
+import heapq
+import math
 import random
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import asdict, dataclass
 from datetime import datetime
-from typing import Any
+from itertools import chain
+from typing import Any, TypeVar, cast
 
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, load_only
 
-from models import DEFAULT_ALGORITHM_CONFIG, Arpeggio, PracticeEntry, Scale, Setting
+from models import Arpeggio, PracticeEntry, Scale
+from services.algorithm_config import get_algorithm_settings
 
+T = TypeVar("T")
 
-def get_algorithm_config(db: Session) -> dict[str, Any]:
-    """Get the current algorithm configuration from the database."""
-    setting = db.query(Setting).filter(Setting.key == "selection_algorithm").first()
-    if setting:
-        return dict(setting.value)
-    return DEFAULT_ALGORITHM_CONFIG
+# Aggregated practice stats keyed by (entry count, highest entry id). Entries are
+# treated as append-only: adding or deleting entries changes the key, editing one
+# in place does not.
+_PRACTICE_STATS_CACHE_SIZE = 10
+_practice_stats_cache: OrderedDict[tuple[int, int], dict[tuple[str, int], tuple[int, datetime]]] = (
+    OrderedDict()
+)
+_practice_stats_lock = threading.Lock()
 
 
-def calculate_item_weight(
-    base_weight: float,
-    practice_count: int,
-    days_since_practice: int | None,
-    weighting_config: dict[str, Any],
-) -> float:
-    """Calculate the final weight for an item based on config."""
-    base_mult = float(weighting_config.get("base_multiplier", 1.0))
-    days_factor = float(weighting_config.get("days_since_practice_factor", 7))
-    count_divisor = float(weighting_config.get("practice_count_divisor", 1))
+def clear_practice_stats_cache() -> None:
+    """Drop cached practice stats (e.g. after the database is recreated)."""
+    with _practice_stats_lock:
+        _practice_stats_cache.clear()
 
-    # If never practiced, treat as very old (30 days)
-    if days_since_practice is None:
-        days_since_practice = 30
 
-    # Formula: base_weight * base_multiplier * (1 + days_since/days_factor) / (practice_count + divisor)
-    return (
-        base_weight
-        * base_mult
-        * (1 + days_since_practice / days_factor)
-        / (practice_count + count_divisor)
-    )
+def load_practice_stats(db: Session) -> dict[tuple[str, int], tuple[int, datetime]]:
+    """Get practice count and last practice time for every practiced item.
 
+    Returns a dict mapping (item_type, item_id) to (practice_count, last_practice).
+    Items that were never practiced are absent.
 
-def get_practice_stats(db: Session, item_type: str, item_id: int) -> tuple[int, int | None]:
-    """Get practice count and days since last practice for an item."""
-    entries = (
-        db.query(PracticeEntry)
-        .filter(
-            PracticeEntry.item_type == item_type,
-            PracticeEntry.item_id == item_id,
-            PracticeEntry.was_practiced,
+    Results are cached by (entry count, highest entry id), which assumes practice
+    entries are append-only: new or deleted entries are picked up, but changes to
+    an existing entry are not.
+    """
+    entry_count, max_id = db.query(func.count(PracticeEntry.id), func.max(PracticeEntry.id)).one()
+    version = (entry_count, max_id or 0)
+    with _practice_stats_lock:
+        cached = _practice_stats_cache.get(version)
+        if cached is not None:
+            _practice_stats_cache.move_to_end(version)
+            return cached
+
+    rows = (
+        db.query(
+            PracticeEntry.item_type,
+            PracticeEntry.item_id,
+            func.count(),
+            func.max(PracticeEntry.created_at),
         )
+        .filter(PracticeEntry.was_practiced)
+        .group_by(PracticeEntry.item_type, PracticeEntry.item_id)
         .all()
     )
+    stats = {(item_type, item_id): (count, last) for item_type, item_id, count, last in rows}
 
-    practice_count = len(entries)
+    with _practice_stats_lock:
+        _practice_stats_cache[version] = stats
+        while len(_practice_stats_cache) > _PRACTICE_STATS_CACHE_SIZE:
+            _practice_stats_cache.popitem(last=False)
+    return stats
 
-    if entries:
-        last_practice = max(e.created_at for e in entries)
-        days_since = (datetime.utcnow() - last_practice).days
-    else:
-        days_since = None
 
-    return practice_count, days_since
+def _make_item_weigher(
+    db: Session, weighting_config: dict[str, Any]
+) -> Callable[[str, int, float], float]:
+    """Build the weight function for one selection pass.
 
+    Practice stats and the weighting coefficients are loaded once, so weighing
+    an item is a dict lookup and a few float operations.
+    """
+    stats = load_practice_stats(db)
+    now = datetime.utcnow()
+    base_mult = float(weighting_config.get("base_multiplier", 1.0))
+    days_factor = float(weighting_config.get("days_since_practice_factor", 7))
+    count_divisor = float(weighting_config.get("practice_count_divisor", 1))
 
-def weighted_random_choice(
-    items: list[tuple[dict[str, Any], float]], count: int
-) -> list[dict[str, Any]]:
-    """Select items using weighted random selection without replacement."""
-    if not items or count <= 0:
-        return []
+    def item_weight(item_type: str, item_id: int, base_weight: float) -> float:
+        practice_count, last_practice = stats.get((item_type, item_id), (0, None))
+        # If never practiced, treat as very old (30 days)
+        days_since = (now - last_practice).days if last_practice else 30
+
+        # Formula: base_weight * base_multiplier * (1 + days_since/days_factor) / (practice_count + divisor)
+        return (
+            base_weight
+            * base_mult
+            * (1 + days_since / days_factor)
+            / (practice_count + count_divisor)
+        )
 
-    selected: list[dict[str, Any]] = []
-    remaining = list(items)
+    return item_weight
 
-    for _ in range(min(count, len(remaining))):
-        if not remaining:
-            break
 
-        total_weight = sum(w for _, w in remaining)
-        if total_weight <= 0:
-            # Fall back to uniform random if all weights are 0
-            idx = random.randint(0, len(remaining) - 1)
-        else:
-            r = random.uniform(0, total_weight)
-            cumulative: float = 0.0
-            idx = 0
-            for i, (_, w) in enumerate(remaining):
-                cumulative += w
-                if cumulative >= r:
-                    idx = i
-                    break
+def weighted_random_choice(items: Iterable[tuple[T, float]], count: int) -> list[T]:
+    """Select items using weighted random selection without replacement.
+
+    Uses Efraimidis-Spirakis sampling: every item gets the key log(u) / weight
+    and the `count` largest keys win, in a single pass. Items without a positive
+    weight are only picked once the weighted ones run out, in uniform order.
+    """
+    if count <= 0:
+        return []
 
-        selected.append(remaining[idx][0])
-        remaining.pop(idx)
+    def sampling_key(item: tuple[T, float]) -> tuple[int, float]:
+        u = 1.0 - random.random()  # in (0, 1], so log(u) is defined
+        weight = item[1]
+        if weight > 0:
+            return (1, math.log(u) / weight)
+        # Fall back to uniform random among the items with no weight
+        return (0, u)
 
-    return selected
+    return [item for item, _ in heapq.nlargest(count, items, key=sampling_key)]
 
 
-def calculate_all_likelihoods(db: Session) -> dict[tuple[str, int], float]:
+def calculate_all_likelihoods(
+    db: Session, config: dict[str, Any] | None = None
+) -> dict[tuple[str, int], float]:
     """Calculate selection likelihood for all enabled items.
 
     This returns the BASE selection probability without weekly focus boost.
@@ -105,28 +133,22 @@ def calculate_all_likelihoods(db: Session) -> dict[tuple[str, int], float]:
     - Days since last practice
     - Total practice count
 
+    Pass config when the caller has already loaded the algorithm settings.
+
     Returns a dict mapping (item_type, item_id) to normalized probability (0-1).
     """
-    config = get_algorithm_config(db)
+    if config is None:
+        config = get_algorithm_settings(db).config
     weighting_config: dict[str, Any] = config.get("weighting", {})
 
-    all_weights: list[tuple[tuple[str, int], float]] = []
-
-    # Calculate weights for all enabled scales
-    scales = db.query(Scale).filter(Scale.enabled).all()
-    for scale in scales:
-        practice_count, days_since = get_practice_stats(db, "scale", scale.id)
-        weight = calculate_item_weight(scale.weight, practice_count, days_since, weighting_config)
-        all_weights.append((("scale", scale.id), weight))
-
-    # Calculate weights for all enabled arpeggios
-    arpeggios = db.query(Arpeggio).filter(Arpeggio.enabled).all()
-    for arpeggio in arpeggios:
-        practice_count, days_since = get_practice_stats(db, "arpeggio", arpeggio.id)
-        weight = calculate_item_weight(
-            arpeggio.weight, practice_count, days_since, weighting_config
-        )
-        all_weights.append((("arpeggio", arpeggio.id), weight))
+    item_weight = _make_item_weigher(db, weighting_config)
+
+    # Only ids and weights are needed, so read plain rows instead of ORM objects
+    all_weights = [
+        ((item_type, item_id), item_weight(item_type, item_id, weight))
+        for item_type, model in (("scale", Scale), ("arpeggio", Arpeggio))
+        for item_id, weight in db.execute(select(model.id, model.weight).where(model.enabled))
+    ]
 
     # Normalize to probabilities (0-1)
     total_weight = sum(w for _, w in all_weights)
@@ -138,98 +160,105 @@ def calculate_all_likelihoods(db: Session) -> dict[tuple[str, int], float]:
     return {key: weight / total_weight for key, weight in all_weights}
 
 
+@dataclass(slots=True)
+class ItemData:
+    """A candidate item in a practice set pool."""
+
+    type: str
+    id: int
+    display_name: str
+    octaves: int
+    target_bpm: int
+    is_weekly_focus: bool
+    articulation_mode: str
+    articulation: str | None = None
+
+
 def _build_item_data(
     item: Scale | Arpeggio,
     item_type: str,
     default_bpm: int,
     is_focus: bool,
-) -> dict[str, Any]:
-    """Build the item data dictionary."""
-    return {
-        "type": item_type,
-        "id": item.id,
-        "display_name": item.display_name(),
-        "octaves": item.octaves,
-        "target_bpm": item.target_bpm or default_bpm,
-        "is_weekly_focus": is_focus,
-        "articulation_mode": item.articulation_mode,
-    }
-
-
-def _get_all_weighted_items(
+) -> ItemData:
+    """Build the item data for a pool entry."""
+    return ItemData(
+        type=item_type,
+        id=item.id,
+        display_name=item.display_name(),
+        octaves=item.octaves,
+        target_bpm=item.target_bpm or default_bpm,
+        is_weekly_focus=is_focus,
+        articulation_mode=item.articulation_mode,
+    )
+
+
+def _iter_weighted_items(
     db: Session,
     weighting_config: dict[str, Any],
     octave_variety: bool,
-    used_octaves: list[int],
+    used_octaves: set[int],
     default_scale_bpm: int,
     default_arpeggio_bpm: int,
     wf_enabled: bool,
-    wf_keys: list[str],
-    wf_types: list[str],
-    wf_categories: list[str],
+    wf_keys: frozenset[str],
+    wf_types: frozenset[str],
+    wf_categories: frozenset[str],
     excluded_ids: set[tuple[str, int]] | None = None,
-) -> tuple[list[tuple[dict[str, Any], float]], list[tuple[dict[str, Any], float]]]:
+) -> Iterator[tuple[ItemData, float, bool]]:
     """
-    Get all enabled items with weights, split into focus and non-focus pools.
-    Returns (focus_items, non_focus_items) where each is list of (item_data, weight).
+    Yield every enabled item with its weight and whether it is a focus item,
+    as (item_data, weight, is_focus), so callers can sample without keeping a pool.
     """
     excluded = excluded_ids or set()
-    focus_items: list[tuple[dict[str, Any], float]] = []
-    non_focus_items: list[tuple[dict[str, Any], float]] = []
-
-    # Process scales
-    scales = db.query(Scale).filter(Scale.enabled).all()
-    for s in scales:
-        if ("scale", s.id) in excluded:
-            continue
-        practice_count, days_since = get_practice_stats(db, "scale", s.id)
-        weight = calculate_item_weight(s.weight, practice_count, days_since, weighting_config)
-        if octave_variety and s.octaves in used_octaves:
-            weight *= 0.5
-
-        # Check if scale passes category filter and matches key/type criteria
-        matches_category = not wf_categories or "scale" in wf_categories
-        has_key_or_type_criteria = wf_keys or wf_types
-        matches_key_or_type = s.note in wf_keys or s.type in wf_types
-        is_focus = (
-            wf_enabled
-            and matches_category
-            and (not has_key_or_type_criteria or matches_key_or_type)
-        )
-        item_data = _build_item_data(s, "scale", default_scale_bpm, is_focus)
 
-        if is_focus:
-            focus_items.append((item_data, weight))
-        else:
-            non_focus_items.append((item_data, weight))
-
-    # Process arpeggios
-    arps = db.query(Arpeggio).filter(Arpeggio.enabled).all()
-    for a in arps:
-        if ("arpeggio", a.id) in excluded:
-            continue
-        practice_count, days_since = get_practice_stats(db, "arpeggio", a.id)
-        weight = calculate_item_weight(a.weight, practice_count, days_since, weighting_config)
-        if octave_variety and a.octaves in used_octaves:
-            weight *= 0.5
-
-        # Check if arpeggio passes category filter and matches key/type criteria
-        matches_category = not wf_categories or "arpeggio" in wf_categories
-        has_key_or_type_criteria = wf_keys or wf_types
-        matches_key_or_type = a.note in wf_keys or a.type in wf_types
-        is_focus = (
-            wf_enabled
-            and matches_category
-            and (not has_key_or_type_criteria or matches_key_or_type)
-        )
-        item_data = _build_item_data(a, "arpeggio", default_arpeggio_bpm, is_focus)
+    # Practice stats for every item in one aggregate query, instead of one per item
+    item_weight = _make_item_weigher(db, weighting_config)
+
+    # Resolve the focus criteria once: set lookups for keys/types, and whether
+    # each category can contain focus items at all (never when focus is disabled)
+    focus_keys = set(wf_keys)
+    focus_types = set(wf_types)
+    has_key_or_type_criteria = bool(focus_keys or focus_types)
+    scale_focus = wf_enabled and (not wf_categories or "scale" in wf_categories)
+    arpeggio_focus = wf_enabled and (not wf_categories or "arpeggio" in wf_categories)
+    categories: tuple[tuple[str, type[Scale] | type[Arpeggio], int, bool], ...] = (
+        ("scale", Scale, default_scale_bpm, scale_focus),
+        ("arpeggio", Arpeggio, default_arpeggio_bpm, arpeggio_focus),
+    )
 
-        if is_focus:
-            focus_items.append((item_data, weight))
-        else:
-            non_focus_items.append((item_data, weight))
+    # One pass per category, sharing the weighting and focus logic
+    for item_type, model, default_bpm, can_be_focus in categories:
+        # Only the columns the item data and focus matching read
+        items = cast(
+            list[Scale | Arpeggio],
+            db.query(model)
+            .options(
+                load_only(
+                    model.id,
+                    model.note,
+                    model.accidental,
+                    model.type,
+                    model.octaves,
+                    model.weight,
+                    model.target_bpm,
+                    model.articulation_mode,
+                )
+            )
+            .filter(model.enabled)
+            .all(),
+        )
+        for item in items:
+            if (item_type, item.id) in excluded:
+                continue
+            weight = item_weight(item_type, item.id, item.weight)
+            if octave_variety and item.octaves in used_octaves:
+                weight *= 0.5
 
-    return focus_items, non_focus_items
+            # Check if item passes category filter and matches key/type criteria
+            is_focus = can_be_focus and (
+                not has_key_or_type_criteria or item.note in focus_keys or item.type in focus_types
+            )
+            yield _build_item_data(item, item_type, default_bpm, is_focus), weight, is_focus
 
 
 def generate_practice_set(db: Session) -> list[dict[str, Any]]:
@@ -242,7 +271,8 @@ def generate_practice_set(db: Session) -> list[dict[str, Any]]:
     - Remaining slots are filled from non-focus items
     - If either pool can't fill its allocated slots, the other pool is used as fallback
     """
-    config = get_algorithm_config(db)
+    settings = get_algorithm_settings(db)
+    config = settings.config
 
     total_items = int(config.get("total_items", 5))
     if total_items <= 0:
@@ -251,20 +281,19 @@ def generate_practice_set(db: Session) -> list[dict[str, Any]]:
     weighting_config: dict[str, Any] = config.get("weighting", {})
     default_scale_bpm = int(config.get("default_scale_bpm", 60))
     default_arpeggio_bpm = int(config.get("default_arpeggio_bpm", 72))
-    weekly_focus = config.get("weekly_focus", {})
-    wf_enabled = weekly_focus.get("enabled", False)
-    wf_keys = weekly_focus.get("keys", [])
-    wf_types = weekly_focus.get("types", [])
-    wf_categories = weekly_focus.get("categories", [])
-    wf_probability = float(weekly_focus.get("probability_increase", 80))
+    weekly_focus = settings.weekly_focus
+    wf_enabled = weekly_focus.enabled
+    wf_keys = weekly_focus.keys
+    wf_types = weekly_focus.types
+    wf_categories = weekly_focus.categories
+    wf_probability = weekly_focus.probability_increase
 
     slurred_percent = float(config.get("slurred_percent", 50))
 
-    selected_items: list[dict[str, Any]] = []
-    used_octaves: list[int] = []
+    selected_items: list[ItemData] = []
+    used_octaves: set[int] = set()
 
-    # Get all items split by focus status
-    focus_pool, non_focus_pool = _get_all_weighted_items(
+    weighted_items = _iter_weighted_items(
         db,
         weighting_config,
         octave_variety,
@@ -277,7 +306,18 @@ def generate_practice_set(db: Session) -> list[dict[str, Any]]:
         wf_categories,
     )
 
-    if wf_enabled and (wf_keys or wf_types or wf_categories):
+    # Slot allocation needs the items split by focus status, and the leftovers
+    # of both pools for its fallback, so only then are the pools materialised
+    has_focus_criteria = wf_enabled and (wf_keys or wf_types or wf_categories)
+    focus_pool: list[tuple[ItemData, float]] = []
+    non_focus_pool: list[tuple[ItemData, float]] = []
+    if has_focus_criteria:
+        for item_data, weight, is_focus in weighted_items:
+            (focus_pool if is_focus else non_focus_pool).append((item_data, weight))
+
+    # With one pool empty, slot allocation reduces to sampling the other pool,
+    # so it only runs when both pools have candidates
+    if focus_pool and non_focus_pool:
         # Slot allocation mode: reserve slots for focus items
         focus_slots = round(total_items * wf_probability / 100)
         non_focus_slots = total_items - focus_slots
@@ -286,41 +326,47 @@ def generate_practice_set(db: Session) -> list[dict[str, Any]]:
         focus_selections = weighted_random_choice(focus_pool, focus_slots)
         for sel in focus_selections:
             selected_items.append(sel)
-            used_octaves.append(int(sel["octaves"]))
+            used_octaves.add(sel.octaves)
 
         # Track selected IDs to avoid duplicates
-        selected_ids = {(i["type"], i["id"]) for i in selected_items}
+        selected_ids = {(i.type, i.id) for i in selected_items}
 
         # Phase 2: Fill non-focus slots from non-focus pool
-        available_non_focus = [
-            (d, w) for d, w in non_focus_pool if (d["type"], d["id"]) not in selected_ids
-        ]
+        available_non_focus = (
+            (d, w) for d, w in non_focus_pool if (d.type, d.id) not in selected_ids
+        )
         non_focus_selections = weighted_random_choice(available_non_focus, non_focus_slots)
         for sel in non_focus_selections:
             selected_items.append(sel)
-            used_octaves.append(int(sel["octaves"]))
-            selected_ids.add((sel["type"], sel["id"]))
+            used_octaves.add(sel.octaves)
+            selected_ids.add((sel.type, sel.id))
 
         # Phase 3: Fallback if we couldn't fill all slots
         if len(selected_items) < total_items:
             needed = total_items - len(selected_items)
             # Try remaining focus items first, then non-focus
-            all_remaining = [
+            all_remaining = (
                 (d, w)
-                for d, w in focus_pool + non_focus_pool
-                if (d["type"], d["id"]) not in selected_ids
-            ]
+                for d, w in chain(focus_pool, non_focus_pool)
+                if (d.type, d.id) not in selected_ids
+            )
             fallback_selections = weighted_random_choice(all_remaining, needed)
             for sel in fallback_selections:
                 selected_items.append(sel)
-                used_octaves.append(int(sel["octaves"]))
+                used_octaves.add(sel.octaves)
     else:
-        # Standard mode: no weekly focus, select from all items
-        all_items = focus_pool + non_focus_pool
-        selections = weighted_random_choice(all_items, total_items)
+        # Standard mode: no weekly focus (or a single pool), select from all items.
+        # Without focus criteria this samples straight from the stream, keeping
+        # only the total_items best candidates in memory.
+        candidates = (
+            chain(focus_pool, non_focus_pool)
+            if has_focus_criteria
+            else ((item_data, weight) for item_data, weight, _ in weighted_items)
+        )
+        selections = weighted_random_choice(candidates, total_items)
         for sel in selections:
             selected_items.append(sel)
-            used_octaves.append(int(sel["octaves"]))
+            used_octaves.add(sel.octaves)
 
     random.shuffle(selected_items)
 
@@ -328,11 +374,11 @@ def generate_practice_set(db: Session) -> list[dict[str, Any]]:
     # First, handle forced modes
     both_indices = []
     for i, selected in enumerate(selected_items):
-        mode = selected.get("articulation_mode", "both")
+        mode = selected.articulation_mode
         if mode == "separate_only":
-            selected["articulation"] = "separate"
+            selected.articulation = "separate"
         elif mode == "slurred_only":
-            selected["articulation"] = "slurred"
+            selected.articulation = "slurred"
         else:
             both_indices.append(i)
 
@@ -341,6 +387,6 @@ def generate_practice_set(db: Session) -> list[dict[str, Any]]:
         num_slurred = round(len(both_indices) * slurred_percent / 100)
         slurred_indices = set(random.sample(both_indices, num_slurred))
         for i in both_indices:
-            selected_items[i]["articulation"] = "slurred" if i in slurred_indices else "separate"
+            selected_items[i].articulation = "slurred" if i in slurred_indices else "separate"
 
-    return selected_items
+    return [asdict(item) for item in selected_items]
@@ -1,11 +1,13 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from database import Base, get_db
 from main import app
+from services.algorithm_config import clear_algorithm_settings_cache
+from services.selector import clear_practice_stats_cache
 
 # Use an in-memory SQLite database for tests
 SQLALCHEMY_DATABASE_URL = "sqlite://"
@@ -22,6 +24,10 @@ TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engin
 def db():
     # Create the database tables
     Base.metadata.create_all(bind=engine)
+    # Cached stats are keyed by entry ids, which restart with every fresh database
+    clear_practice_stats_cache()
+    # Likewise the cached settings are keyed by updated_at, which a new row can repeat
+    clear_algorithm_settings_cache()
     db = TestingSessionLocal()
     try:
         yield db
@@ -43,3 +49,18 @@ def client(db):
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def query_counter():
+    """Collect the SQL statements executed on the test engine."""
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
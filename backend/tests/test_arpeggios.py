@@ -22,6 +22,7 @@ def test_get_arpeggios_with_data(client, db):
     response = client.get("/api/arpeggios?enabled=true")
     assert len(response.json()) == 1
     assert response.json()[0]["note"] == "C"
+    assert response.json()[0]["display_name"] == "C major arpeggio - 2 octaves"
 
 
 def test_update_arpeggio(client, db):
@@ -34,6 +35,7 @@ def test_update_arpeggio(client, db):
     assert response.status_code == 200
     assert response.json()["enabled"] is False
     assert response.json()["target_bpm"] == 80
+    assert response.json()["display_name"] == "C major arpeggio - 2 octaves"
 
     # Verify in DB
     db.refresh(a1)
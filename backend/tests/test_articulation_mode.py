@@ -87,7 +87,7 @@ def test_run_migrations_includes_v9(db):
     """run_migrations should include v9 migration."""
     from services.migrations import CURRENT_SCHEMA_VERSION, MIGRATIONS
 
-    assert CURRENT_SCHEMA_VERSION == 9
+    assert CURRENT_SCHEMA_VERSION == 13
     assert 9 in MIGRATIONS
     assert "articulation_mode" in MIGRATIONS[9].lower()
 
@@ -0,0 +1,216 @@
+"""Tests for schema migrations."""
+
+from sqlalchemy import event, inspect, text
+
+from models import DEFAULT_ALGORITHM_CONFIG, Arpeggio, SchemaVersion, SelectionSet, Setting
+from services.migrations import (
+    CURRENT_SCHEMA_VERSION,
+    MIGRATION_STEPS,
+    MIGRATIONS,
+    get_current_version,
+    migrate_v0_to_v1,
+    migrate_v2_to_v3,
+    migrate_v5_to_v6,
+    migrate_v6_to_v7,
+    migrate_v9_to_v10,
+    migrate_v10_to_v11,
+    migrate_v11_to_v12,
+    migrate_v12_to_v13,
+    run_migrations,
+    snapshot_schema,
+)
+
+
+def test_migration_v0_to_v1_adds_missing_one_octave_arpeggios(db):
+    """Migration v0->v1 should add only the missing 1-octave arpeggios."""
+    db.add(Arpeggio(note="A", type="major", octaves=1))
+    db.add(Arpeggio(note="B", accidental="flat", type="minor", octaves=1))
+    db.add(Arpeggio(note="B", accidental="flat", type="minor", octaves=2))
+    db.commit()
+
+    assert migrate_v0_to_v1(db)["arpeggios_added"] == 82
+    assert migrate_v0_to_v1(db)["arpeggios_added"] == 0
+    assert db.query(Arpeggio).filter(Arpeggio.octaves == 1).count() == 84
+
+
+def test_migration_uses_schema_snapshot(db):
+    """Column checks read the batched snapshot instead of reflecting per table."""
+    db.execute(text("ALTER TABLE practice_entries DROP COLUMN practiced_bpm"))
+    schema = snapshot_schema(db)
+    assert "practiced_bpm" not in schema["practice_entries"]
+    assert "selection_set_id" in schema["practice_sessions"]
+
+    assert migrate_v2_to_v3(db, schema) == {"columns_added": ["practiced_bpm"]}
+    assert migrate_v2_to_v3(db) == {"columns_added": []}
+
+
+def test_migration_v5_to_v6_adds_missing_gains_in_place(db):
+    """Migration v5->v6 should add only the gain keys that are missing."""
+    assert migrate_v5_to_v6(db)["status"] == "skipped"
+
+    setting = Setting(key="selection_algorithm", value={"slurred_percent": 40, "drone_gain": 0.9})
+    db.add(setting)
+    db.commit()
+
+    assert migrate_v5_to_v6(db)["status"] == "updated"
+    assert migrate_v5_to_v6(db) == {"status": "already_up_to_date"}
+
+    db.refresh(setting)
+    assert setting.value == {
+        "slurred_percent": 40,
+        "drone_gain": 0.9,
+        "metronome_gain": DEFAULT_ALGORITHM_CONFIG["metronome_gain"],
+    }
+
+
+def test_migration_v6_to_v7_resets_gains_in_place(db):
+    """Migration v6->v7 should overwrite both gains and keep other keys."""
+    assert migrate_v6_to_v7(db)["status"] == "skipped"
+
+    setting = Setting(
+        key="selection_algorithm",
+        value={"slurred_percent": 40, "metronome_gain": 0.1, "drone_gain": 0.9},
+    )
+    db.add(setting)
+    db.commit()
+
+    assert migrate_v6_to_v7(db)["status"] == "updated"
+
+    db.refresh(setting)
+    assert setting.value == {
+        "slurred_percent": 40,
+        "metronome_gain": DEFAULT_ALGORITHM_CONFIG["metronome_gain"],
+        "drone_gain": DEFAULT_ALGORITHM_CONFIG["drone_gain"],
+    }
+
+
+def test_migration_v9_to_v10_adds_practice_entry_indexes(db):
+    """Migration v9->v10 should ensure the practice_entries indexes exist."""
+    migrate_v9_to_v10(db)
+    # Running twice must be a no-op
+    migrate_v9_to_v10(db)
+
+    inspector = inspect(db.get_bind())
+    indexes = {
+        idx["name"]: idx["column_names"] for idx in inspector.get_indexes("practice_entries")
+    }
+    assert indexes["ix_practice_entries_item"] == ["item_type", "item_id"]
+    assert indexes["ix_practice_entries_session"] == ["session_id"]
+
+
+def test_migration_v10_to_v11_adds_partial_active_index(db):
+    """Migration v10->v11 should ensure the partial selection_sets index exists."""
+    migrate_v10_to_v11(db)
+    migrate_v10_to_v11(db)
+
+    inspector = inspect(db.get_bind())
+    indexes = {idx["name"]: idx for idx in inspector.get_indexes("selection_sets")}
+    assert indexes["ix_selection_sets_active"]["column_names"] == ["is_active"]
+
+
+def test_migration_v11_to_v12_keeps_one_active_selection_set(db):
+    """Migration v11->v12 should leave a single active set behind a unique index."""
+    db.execute(text("DROP INDEX ix_selection_sets_one_active"))
+    migrate_v10_to_v11(db)
+    for name in ("Set A", "Set B"):
+        db.add(SelectionSet(name=name, scale_ids=[], arpeggio_ids=[], is_active=True))
+    db.commit()
+
+    result = migrate_v11_to_v12(db)
+    assert result["sets_deactivated"] == 1
+    assert migrate_v11_to_v12(db)["sets_deactivated"] == 0
+    db.commit()
+
+    active = db.query(SelectionSet).filter(SelectionSet.is_active).all()
+    assert [s.name for s in active] == ["Set B"]
+    indexes = {idx["name"]: idx for idx in inspect(db.get_bind()).get_indexes("selection_sets")}
+    assert "ix_selection_sets_active" not in indexes
+    assert indexes["ix_selection_sets_one_active"]["unique"]
+
+
+def test_migration_v12_to_v13_replaces_item_index_with_covering_index(db):
+    """Migration v12->v13 should leave only the covering practice stats index."""
+    migrate_v9_to_v10(db)
+    migrate_v12_to_v13(db)
+    migrate_v12_to_v13(db)
+    db.commit()
+
+    indexes = {
+        idx["name"]: idx["column_names"]
+        for idx in inspect(db.get_bind()).get_indexes("practice_entries")
+    }
+    assert "ix_practice_entries_item" not in indexes
+    assert indexes["ix_practice_entries_item_stats"] == [
+        "item_type",
+        "item_id",
+        "was_practiced",
+        "created_at",
+    ]
+
+    plan = db.execute(
+        text(
+            "EXPLAIN QUERY PLAN SELECT item_type, item_id, count(*), max(created_at) "
+            "FROM practice_entries WHERE was_practiced GROUP BY item_type, item_id"
+        )
+    ).all()
+    assert "COVERING INDEX ix_practice_entries_item_stats" in plan[0].detail
+
+
+def test_run_migrations_up_to_date_is_noop(db, query_counter):
+    """An up-to-date database only pays for the version lookup."""
+    db.add(SchemaVersion(version=CURRENT_SCHEMA_VERSION, description="current"))
+    db.commit()
+    query_counter.clear()
+
+    result = run_migrations(db)
+    assert result["migrations_applied"] == []
+    assert result["final_version"] == CURRENT_SCHEMA_VERSION
+    # Table existence check plus the version lookup
+    assert len(query_counter) == 2
+
+
+def test_get_current_version_without_schema_versions_table(db):
+    """A database without the schema_versions table is unversioned."""
+    db.execute(text("DROP TABLE schema_versions"))
+    db.commit()
+    assert get_current_version(db) == 0
+
+
+def test_get_current_version_keeps_pending_session_state(db):
+    """Probing an unversioned database does not roll back the caller's work."""
+    db.execute(text("DROP TABLE schema_versions"))
+    db.commit()
+    db.add(Setting(key="pending", value={}))
+    db.flush()
+
+    assert get_current_version(db) == 0
+    assert db.query(Setting).filter(Setting.key == "pending").count() == 1
+
+
+def test_run_migrations_commits_pending_ladder_once(db):
+    """Pending migrations and their version rows are committed together."""
+    db.add(SchemaVersion(version=9, description="v9"))
+    db.commit()
+
+    commits = []
+
+    def after_commit(session):
+        commits.append(session)
+
+    event.listen(db, "after_commit", after_commit)
+    try:
+        result = run_migrations(db)
+    finally:
+        event.remove(db, "after_commit", after_commit)
+
+    assert [m["version"] for m in result["migrations_applied"]] == [10, 11, 12, 13]
+    assert len(commits) == 1
+    db.rollback()
+    assert get_current_version(db) == CURRENT_SCHEMA_VERSION
+
+
+def test_every_schema_version_has_a_migration_step():
+    """Each version up to the current one has a description and a step."""
+    expected = list(range(1, CURRENT_SCHEMA_VERSION + 1))
+    assert sorted(MIGRATIONS) == expected
+    assert sorted(MIGRATION_STEPS) == expected
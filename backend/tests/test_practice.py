@@ -1,6 +1,9 @@
 from datetime import datetime, timedelta
 
+from sqlalchemy.orm import selectinload
+
 from models import Arpeggio, PracticeEntry, PracticeSession, Scale, Setting
+from services.selector import load_practice_stats, weighted_random_choice
 
 
 def test_generate_practice_set_empty(client):
@@ -31,6 +34,55 @@ def test_generate_practice_set_with_data(client, db):
         assert "display_name" in item
 
 
+def test_generate_practice_set_loads_stats_in_one_query(client, db, query_counter):
+    """Practice stats are aggregated once, not queried per enabled item."""
+    scales = [
+        Scale(note=note, type="major", octaves=2, enabled=True, weight=1.0) for note in "CDEFG"
+    ]
+    db.add_all(scales)
+    db.commit()
+    session = PracticeSession()
+    db.add(session)
+    db.flush()
+    db.add(PracticeEntry(session_id=session.id, item_type="scale", item_id=scales[0].id))
+    db.commit()
+    query_counter.clear()
+
+    response = client.post("/api/generate-set")
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 5
+
+    stats_queries = [q for q in query_counter if "FROM practice_entries" in q]
+    assert len(stats_queries) == 2  # cache version probe + one GROUP BY
+
+
+def test_generate_practice_set_follows_config_updates(client, db):
+    """The cached algorithm config is refreshed when the settings change."""
+    db.add_all(
+        Scale(note=note, type="major", octaves=2, enabled=True, weight=1.0) for note in "CDEFG"
+    )
+    db.commit()
+
+    client.put("/api/settings/algorithm", json={"config": {"total_items": 3}})
+    assert len(client.post("/api/generate-set").json()["items"]) == 3
+
+    client.put("/api/settings/algorithm", json={"config": {"total_items": 2}})
+    assert len(client.post("/api/generate-set").json()["items"]) == 2
+
+
+def test_weighted_random_choice_samples_without_replacement():
+    """Weighted items are picked before zero-weight ones, each at most once."""
+    items = [({"id": i}, 0.0 if i < 3 else 1.0 + i) for i in range(8)]
+
+    picked = [item["id"] for item in weighted_random_choice(items, 6)]
+    assert len(set(picked)) == 6
+    assert set(picked[:5]) == {3, 4, 5, 6, 7}
+    assert picked[5] in {0, 1, 2}
+
+    assert len(weighted_random_choice(items, 20)) == 8
+    assert weighted_random_choice([({"id": 0}, 0.0)], 1) == [{"id": 0}]
+
+
 def test_create_practice_session(client, db):
     s1 = Scale(note="C", type="major", octaves=2, enabled=True)
     db.add(s1)
@@ -61,13 +113,32 @@ def test_create_practice_session(client, db):
     assert data["practiced_count"] == 1
 
     # Verify in DB
-    session = db.query(PracticeSession).first()
+    session = db.query(PracticeSession).options(selectinload(PracticeSession.entries)).first()
     assert session is not None
     assert len(session.entries) == 1
     assert session.entries[0].item_id == s1.id
     assert session.entries[0].practiced_bpm == 65
 
 
+def test_practice_stats_cache_follows_deleted_entries(db):
+    """Deleting an older entry invalidates the cached practice stats."""
+    session = PracticeSession()
+    db.add(session)
+    db.flush()
+    first = PracticeEntry(session_id=session.id, item_type="scale", item_id=1, was_practiced=True)
+    db.add(first)
+    db.flush()
+    db.add(PracticeEntry(session_id=session.id, item_type="scale", item_id=2, was_practiced=True))
+    db.commit()
+    assert ("scale", 1) in load_practice_stats(db)
+
+    db.delete(first)
+    db.commit()
+    stats = load_practice_stats(db)
+    assert ("scale", 1) not in stats
+    assert ("scale", 2) in stats
+
+
 def test_get_practice_history(client, db):
     # Setup an enabled scale so it shows up in history
     s1 = Scale(note="C", type="major", octaves=2, enabled=True, target_bpm=60)
@@ -152,6 +223,7 @@ def test_get_practice_history_detailed_with_data(client, db):
     assert c_major["display_name"] == "C major - 2 octaves"
     assert c_major["octaves"] == 2
     assert c_major["times_practiced"] == 1
+    assert c_major["last_practiced"] is not None
     assert c_major["max_practiced_bpm"] == 65
     assert c_major["target_bpm"] == 60
     assert "selection_likelihood" in c_major
@@ -296,6 +368,25 @@ def test_get_practice_history_detailed_filter_by_date_range(client, db):
     assert data[0]["times_practiced"] == 1
 
 
+def test_get_practice_history_detailed_from_date_boundary(client, db):
+    """An entry created exactly at from_date is included."""
+    s1 = Scale(note="C", type="major", octaves=2, enabled=True)
+    db.add(s1)
+    session = PracticeSession()
+    db.add(session)
+    db.flush()
+    entry = PracticeEntry(
+        session_id=session.id, item_type="scale", item_id=s1.id, was_practiced=True
+    )
+    db.add(entry)
+    db.commit()
+
+    from_date = entry.created_at.isoformat()
+    response = client.get("/api/practice-history-detailed", params={"from_date": from_date})
+    assert response.status_code == 200
+    assert response.json()[0]["times_practiced"] == 1
+
+
 def test_get_practice_history_detailed_weekly_focus(client, db):
     """Test that weekly focus items are marked correctly."""
     s1 = Scale(note="C", type="major", octaves=2, enabled=True)
@@ -327,3 +418,82 @@ def test_get_practice_history_detailed_weekly_focus(client, db):
 
     assert c_scale["is_weekly_focus"] is True
     assert a_scale["is_weekly_focus"] is False
+
+
+def test_get_practice_history_pagination(client, db):
+    """History is ordered least-practiced first and can be paginated."""
+    s1 = Scale(note="C", type="major", octaves=2, enabled=True)
+    s2 = Scale(note="D", type="major", octaves=2, enabled=True)
+    a1 = Arpeggio(note="G", type="major", octaves=2, enabled=True)
+    db.add_all([s1, s2, a1])
+    db.commit()
+
+    session = PracticeSession()
+    db.add(session)
+    db.flush()
+    db.add_all(
+        [
+            PracticeEntry(
+                session_id=session.id, item_type="scale", item_id=s1.id, was_practiced=True
+            ),
+            PracticeEntry(
+                session_id=session.id, item_type="scale", item_id=s1.id, was_practiced=True
+            ),
+            PracticeEntry(
+                session_id=session.id, item_type="arpeggio", item_id=a1.id, was_practiced=True
+            ),
+            PracticeEntry(
+                session_id=session.id, item_type="scale", item_id=s2.id, was_practiced=False
+            ),
+        ]
+    )
+    db.commit()
+
+    response = client.get("/api/practice-history")
+    assert response.status_code == 200
+    data = response.json()
+    assert [(d["item_type"], d["times_practiced"]) for d in data] == [
+        ("scale", 0),
+        ("arpeggio", 1),
+        ("scale", 2),
+    ]
+    assert data[0]["total_sessions"] == 1
+    assert data[0]["last_practiced"] is None
+
+    response = client.get("/api/practice-history?limit=1&offset=1")
+    assert response.status_code == 200
+    assert [d["item_id"] for d in response.json()] == [a1.id]
+
+    response = client.get("/api/practice-history?item_type=arpeggio")
+    assert [d["item_type"] for d in response.json()] == ["arpeggio"]
+
+
+def test_get_practice_history_ties_list_scales_first(client, db):
+    """Items with the same practice count keep scales ahead of arpeggios."""
+    a1 = Arpeggio(note="C", type="major", octaves=2, enabled=True)
+    s1 = Scale(note="D", type="major", octaves=2, enabled=True)
+    s2 = Scale(note="C", type="major", octaves=2, enabled=True)
+    db.add_all([a1, s1, s2])
+    db.commit()
+
+    response = client.get("/api/practice-history")
+    assert response.status_code == 200
+    assert [(d["item_type"], d["item_id"]) for d in response.json()] == [
+        ("scale", s1.id),
+        ("scale", s2.id),
+        ("arpeggio", a1.id),
+    ]
+
+
+def test_create_practice_session_batches_entries(client, db, query_counter):
+    """Entries with and without a BPM are inserted in one executemany."""
+    entries = [
+        {"item_type": "scale", "item_id": i, "was_practiced": True, "practiced_bpm": bpm}
+        for i, bpm in enumerate([60, None, 72, None], start=1)
+    ]
+    response = client.post("/api/practice-session", json={"entries": entries})
+    assert response.status_code == 200
+    assert response.json()["entries_count"] == 4
+
+    entry_inserts = [q for q in query_counter if q.startswith("INSERT INTO practice_entries")]
+    assert len(entry_inserts) == 1
@@ -1,4 +1,5 @@
-from models import Scale
+from models import Arpeggio, Scale, SchemaVersion
+from services.migrations import CURRENT_SCHEMA_VERSION, MIGRATIONS
 
 
 def test_get_scales_empty(client):
@@ -22,6 +23,7 @@ def test_get_scales_with_data(client, db):
     response = client.get("/api/scales?enabled=true")
     assert len(response.json()) == 1
     assert response.json()[0]["note"] == "C"
+    assert response.json()[0]["display_name"] == "C major - 2 octaves"
 
 
 def test_update_scale(client, db):
@@ -65,3 +67,21 @@ def test_bulk_enable_scales(client, db):
     db.refresh(s2)
     assert s1.enabled is True
     assert s2.enabled is True
+
+
+def test_initialize_database_query_count(client, db, query_counter):
+    """Initializing an up-to-date, empty schema takes a fixed number of statements."""
+    db.add(
+        SchemaVersion(
+            version=CURRENT_SCHEMA_VERSION, description=MIGRATIONS[CURRENT_SCHEMA_VERSION]
+        )
+    )
+    db.commit()
+    query_counter.clear()
+
+    response = client.post("/api/init-database")
+    assert response.status_code == 200
+    # version check (2), counts, one INSERT per catalog table, setting, schema version
+    assert len(query_counter) <= 7
+    assert response.json()["scales"] == db.query(Scale).count() == 252
+    assert response.json()["arpeggios"] == db.query(Arpeggio).count() == 252
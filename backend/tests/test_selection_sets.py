@@ -1,5 +1,8 @@
 """Tests for selection sets API routes."""
 
+import pytest
+from sqlalchemy.exc import IntegrityError
+
 from models import Arpeggio, Scale, SelectionSet
 
 
@@ -36,6 +39,14 @@ def test_create_selection_set(client, db):
     assert "updated_at" in data
 
 
+def test_create_selection_set_single_statement(client, db, query_counter):
+    """Creating a set is a single INSERT ... RETURNING."""
+    response = client.post("/api/selection-sets", json={"name": "My Practice Set"})
+    assert response.status_code == 200
+    assert len(query_counter) == 1
+    assert query_counter[0].startswith("INSERT")
+
+
 def test_create_selection_set_duplicate_name(client, db):
     """POST /api/selection-sets returns 409 when name already exists."""
     ss = SelectionSet(name="Existing Set", scale_ids=[], arpeggio_ids=[])
@@ -69,6 +80,18 @@ def test_list_selection_sets(client, db):
     assert "Set B" in names
 
 
+def test_list_selection_sets_single_query(client, db, query_counter):
+    """Listing selection sets must not issue per-row queries."""
+    db.add_all(SelectionSet(name=f"Set {i}", scale_ids=[i], arpeggio_ids=[i]) for i in range(5))
+    db.commit()
+    query_counter.clear()
+
+    response = client.get("/api/selection-sets")
+    assert response.status_code == 200
+    assert len(response.json()) == 5
+    assert len(query_counter) == 1
+
+
 def test_update_selection_set_name(client, db):
     """PUT /api/selection-sets/{id} can update the name."""
     ss = SelectionSet(name="Old Name", scale_ids=[1], arpeggio_ids=[2])
@@ -207,6 +230,48 @@ def test_load_selection_set_deactivates_others(client, db):
     assert ss2.is_active is True
 
 
+def test_load_selection_set_query_count(client, db, query_counter):
+    """Loading a set takes a fixed number of statements regardless of catalog size."""
+    db.add_all(Scale(note="C", type="major", octaves=o, enabled=o == 1) for o in (1, 2, 3))
+    db.add(Arpeggio(note="C", type="major", octaves=2, enabled=True))
+    db.add(SelectionSet(name="Set A", scale_ids=[], arpeggio_ids=[], is_active=True))
+    ss = SelectionSet(name="Set B", scale_ids=[2, 3], arpeggio_ids=[])
+    db.add(ss)
+    db.commit()
+    set_id = ss.id
+    query_counter.clear()
+
+    response = client.post(f"/api/selection-sets/{set_id}/load")
+    assert response.status_code == 200
+    assert response.json()["scales_enabled"] == 2
+    # set lookup, other-set deactivation, one UPDATE per item table, activation
+    assert len(query_counter) <= 5
+
+
+def test_load_selection_set_already_active(client, db):
+    """Reloading the active set keeps it active."""
+    ss = SelectionSet(name="Set A", scale_ids=[], arpeggio_ids=[], is_active=True)
+    db.add(ss)
+    db.commit()
+
+    response = client.post(f"/api/selection-sets/{ss.id}/load")
+    assert response.status_code == 200
+
+    db.refresh(ss)
+    assert ss.is_active is True
+
+
+def test_only_one_selection_set_can_be_active(db):
+    """The database rejects a second active selection set."""
+    db.add(SelectionSet(name="Set A", scale_ids=[], arpeggio_ids=[], is_active=True))
+    db.commit()
+
+    db.add(SelectionSet(name="Set B", scale_ids=[], arpeggio_ids=[], is_active=True))
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.rollback()
+
+
 def test_load_selection_set_not_found(client):
     """POST /api/selection-sets/{id}/load returns 404 for nonexistent set."""
     response = client.post("/api/selection-sets/999/load")
@@ -1,4 +1,6 @@
-from models import DEFAULT_ALGORITHM_CONFIG
+import pytest
+
+from models import DEFAULT_ALGORITHM_CONFIG, Setting
 
 
 def test_get_algorithm_config_default(client):
@@ -26,3 +28,24 @@ def test_reset_algorithm_config(client):
     response = client.post("/api/settings/algorithm/reset")
     assert response.status_code == 200
     assert response.json()["config"] == DEFAULT_ALGORITHM_CONFIG
+
+
+@pytest.mark.parametrize("weekly_focus", [None, {"enabled": True, "keys": [1]}, "not a section"])
+def test_get_algorithm_config_returns_invalid_sections_as_stored(client, weekly_focus):
+    config = {"weekly_focus": weekly_focus}
+    client.put("/api/settings/algorithm", json={"config": config})
+
+    response = client.get("/api/settings/algorithm")
+    assert response.status_code == 200
+    assert response.json()["config"] == config
+
+
+def test_get_algorithm_config_follows_direct_setting_changes(client, db):
+    setting = Setting(key="selection_algorithm", value={"version": 1})
+    db.add(setting)
+    db.commit()
+    assert client.get("/api/settings/algorithm").json()["config"] == {"version": 1}
+
+    setting.value = {"version": 2}
+    db.commit()
+    assert client.get("/api/settings/algorithm").json()["config"] == {"version": 2}
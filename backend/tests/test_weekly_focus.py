@@ -1,3 +1,5 @@
+import pytest
+
 from models import Scale, Setting
 from services.selector import generate_practice_set
 
@@ -146,6 +148,58 @@ def test_weekly_focus_is_flagged_in_api(db, client):
     assert items[0]["is_weekly_focus"] is True
 
 
+def test_weekly_focus_detailed_history_follows_setting_changes(db, client):
+    db.add(Scale(note="A", type="major", octaves=2, enabled=True))
+    setting = Setting(
+        key="selection_algorithm",
+        value={"weekly_focus": {"enabled": True, "keys": ["A"], "types": []}},
+    )
+    db.add(setting)
+    db.commit()
+
+    response = client.get("/api/practice-history-detailed")
+    assert response.json()[0]["is_weekly_focus"] is True
+
+    setting.value = {"weekly_focus": {"enabled": True, "keys": ["B"], "types": []}}
+    db.commit()
+
+    response = client.get("/api/practice-history-detailed")
+    assert response.json()[0]["is_weekly_focus"] is False
+
+
+@pytest.mark.parametrize("weekly_focus", [None, {"enabled": True, "keys": [1]}, ["A"]])
+def test_weekly_focus_invalid_config_is_disabled(db, client, weekly_focus):
+    db.add(Scale(note="A", type="major", octaves=2, enabled=True))
+    db.add(Setting(key="selection_algorithm", value={"weekly_focus": weekly_focus}))
+    db.commit()
+
+    response = client.get("/api/practice-history-detailed")
+    assert response.status_code == 200
+    assert response.json()[0]["is_weekly_focus"] is False
+
+    response = client.post("/api/generate-set")
+    assert response.status_code == 200
+    assert response.json()["items"][0]["is_weekly_focus"] is False
+
+
+def test_weekly_focus_detailed_history_reads_setting_once(db, client, query_counter):
+    db.add(Scale(note="A", type="major", octaves=2, enabled=True))
+    db.add(
+        Setting(
+            key="selection_algorithm",
+            value={"weekly_focus": {"enabled": True, "keys": ["A"], "types": []}},
+        )
+    )
+    db.commit()
+    client.get("/api/practice-history-detailed")
+    query_counter.clear()
+
+    response = client.get("/api/practice-history-detailed")
+    assert response.json()[0]["is_weekly_focus"] is True
+    # Only the updated_at probe: likelihoods and weekly focus share the cached settings
+    assert len([q for q in query_counter if "FROM settings" in q]) == 1
+
+
 def test_weekly_focus_slot_allocation(db, client):
     """Test that slot allocation reserves the correct proportion for focus items."""
     # Create 3 focus scales (A) and 3 non-focus scales (C)
@@ -210,3 +264,27 @@ def test_weekly_focus_slot_allocation_partial(db, client):
     # With 60% boost: 3 focus slots, 2 non-focus slots
     assert focus_count == 3
     assert non_focus_count == 2
+
+
+def test_weekly_focus_without_matching_items_fills_set(db, client):
+    """With no focus candidates, the whole set comes from the other items."""
+    for i in range(5):
+        db.add(Scale(note="C", type="major", octaves=(i % 3) + 1, enabled=True, weight=1.0))
+    db.commit()
+
+    focus_config = {
+        "total_items": 4,
+        "octave_variety": False,
+        "weekly_focus": {
+            "enabled": True,
+            "keys": ["A"],
+            "types": [],
+            "probability_increase": 75,
+        },
+    }
+    db.add(Setting(key="selection_algorithm", value=focus_config))
+    db.commit()
+
+    practice_set = generate_practice_set(db)
+    assert len(practice_set) == 4
+    assert not any(item["is_weekly_focus"] for item in practice_set)